@@ -0,0 +1,147 @@
+"""
+micro-benchmarks for the hot paths of the minimization engine.
+
+usage:
+    python benchmarks/bench_engine.py
+    python benchmarks/bench_engine.py --sizes 1000 --replacements 0,100
+    python benchmarks/bench_engine.py --compare benchmarks/results/engine-0.10.1.json
+
+The checkers which are used here do nothing,
+only the time which is spent in pysource-minimize is measured.
+The results are saved in benchmarks/results/engine-<version>.json by default.
+"""
+
+import argparse
+import ast
+import copy
+import json
+import platform
+import timeit
+from pathlib import Path
+
+import pysource_minimize
+from corpus import generate_tree
+from pysource_minimize._minimize import _source_checker
+from pysource_minimize._minimize_base import equal_ast
+from pysource_minimize._minimize_base import MinimizeBase
+
+results_dir = Path(__file__).parent / "results"
+
+
+class SetupOnly(MinimizeBase):
+    """
+    prepares the tree like every strategy, but does not minimize anything
+    """
+
+    def minimize_stmt(self, stmt):
+        pass
+
+
+def accept_replacements(minimizer, count):
+    """
+    accepts `count` replacements which are evenly distributed over the tree,
+    like they would be accepted during the minimization.
+    """
+    if not count:
+        return
+    candidates = [
+        node
+        for node in ast.walk(minimizer.original_ast)
+        if isinstance(node, ast.expr)
+        and not isinstance(getattr(node, "ctx", None), (ast.Store, ast.Del))
+    ]
+    for node in candidates[:: max(len(candidates) // count, 1)][:count]:
+        minimizer.replaced[minimizer.index_of(node)] = ast.Constant(value=0)
+
+
+def operations(tree, replacements):
+    minimizer = SetupOnly(tree, lambda tree: True, lambda current, total: None)
+    accept_replacements(minimizer, replacements)
+
+    # every candidate is rejected and the state of the minimizer does not change
+    minimizer.checker = lambda tree: False
+
+    current = minimizer.get_current_tree({})
+    current_copy = copy.deepcopy(current)
+    stmt_index = minimizer.index_of(minimizer.original_ast.body[-1])
+    source_checker = _source_checker(lambda source: False, compilable=True)
+
+    return {
+        "MinimizeBase.__init__": lambda: SetupOnly(
+            tree, lambda tree: True, lambda current, total: None
+        ),
+        "get_ast": lambda: minimizer.get_ast(minimizer.original_ast),
+        "get_current_tree": lambda: minimizer.get_current_tree({}),
+        "try_with": lambda: minimizer.try_with({stmt_index: []}),
+        "equal_ast": lambda: equal_ast(current, current_copy),
+        "source_checker": lambda: source_checker(current),
+    }
+
+
+def measure(function, repeat):
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def key(record):
+    return (record["size"], record["replacements"], record["operation"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--replacements", default="0,10,100")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=results_dir / f"engine-{pysource_minimize.version}.json",
+    )
+    parser.add_argument(
+        "--compare", type=Path, help="results of a previous run to compare with"
+    )
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        baseline = {key(r): r for r in json.loads(args.compare.read_text())["results"]}
+
+    print(f"{'size':>7} {'replacements':>12} {'operation':<22} {'time':>12}")
+
+    records = []
+    for size in map(int, args.sizes.split(",")):
+        tree = generate_tree(size, args.seed)
+        for replacements in map(int, args.replacements.split(",")):
+            for name, function in operations(tree, replacements).items():
+                record = {
+                    "size": size,
+                    "replacements": replacements,
+                    "operation": name,
+                    "time": measure(function, args.repeat),
+                }
+                records.append(record)
+
+                line = f"{size:>7} {replacements:>12} {name:<22} {record['time'] * 1e3:>9.3f} ms"
+                old = baseline.get(key(record))
+                if old is not None:
+                    line += f" ({(record['time'] - old['time']) / old['time']:+.0%})"
+                print(line, flush=True)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(
+            {
+                "version": pysource_minimize.version,
+                "python": platform.python_version(),
+                "results": records,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+end-to-end benchmark of the minimization over generated sources.
+
+usage:
+    python benchmarks/bench_minimize.py
+    python benchmarks/bench_minimize.py --sizes 100000 --strategies all
+    python benchmarks/bench_minimize.py --compare benchmarks/results/0.10.1.json
+
+Every strategy is also benchmarked on its own,
+which takes some time for the larger sizes.
+
+The results are saved in benchmarks/results/<version>.json by default,
+which allows to compare the results of different versions.
+"""
+
+import argparse
+import ast
+import functools
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import pysource_minimize
+from corpus import generate_tree
+from corpus import hide_needles
+from corpus import needle_oracle
+from corpus import node_count
+from corpus import oracles
+from pysource_minimize._minimize import _minimize_source
+from pysource_minimize._minimize import default_strategies
+
+results_dir = Path(__file__).parent / "results"
+
+strategies = {
+    **{strategy.__name__: (strategy,) for strategy in default_strategies},
+    "all": default_strategies,
+}
+
+
+class CountingChecker:
+    def __init__(self, oracle):
+        self.oracle = oracle
+        self.calls = 0
+        self.time = 0.0
+
+    def __call__(self, source):
+        self.calls += 1
+        start = time.perf_counter()
+        try:
+            return self.oracle(source)
+        finally:
+            self.time += time.perf_counter() - start
+
+
+@functools.lru_cache(maxsize=None)
+def generate_source(size, seed, needles):
+    return hide_needles(generate_tree(size, seed), needles)
+
+
+def run(size, seed, oracle_name, strategy_name, prepass=False):
+    source = generate_source(size, seed, oracles[oracle_name])
+    checker = CountingChecker(needle_oracle(oracles[oracle_name]))
+
+    start = time.perf_counter()
+    result = _minimize_source(
+        source,
+        checker,
+        retries=0,
+        strategies=strategies[strategy_name],
+        prepass=prepass,
+    )
+    wall = time.perf_counter() - start
+
+    return {
+        "size": size,
+        "seed": seed,
+        "nodes": node_count(ast.parse(source)),
+        "oracle": oracle_name,
+        "strategy": strategy_name,
+        "prepass": prepass,
+        "wall": wall,
+        "checker_calls": checker.calls,
+        "oracle_time": checker.time,
+        "overhead": wall - checker.time,
+        "final_nodes": node_count(ast.parse(result)),
+        "final_length": len(result),
+    }
+
+
+def key(record):
+    return (
+        record["size"],
+        record["seed"],
+        record["oracle"],
+        record["strategy"],
+        record.get("prepass", False),
+    )
+
+
+def print_table(records, baseline=None):
+    baseline = {key(r): r for r in (baseline or [])}
+
+    columns = ("wall", "overhead", "checker_calls", "final_nodes")
+    print(
+        f"{'size':>7} {'oracle':<12} {'strategy':<20}"
+        + "".join(f"{c:>22}" for c in columns)
+    )
+    for record in records:
+        line = f"{record['size']:>7} {record['oracle']:<12} {record['strategy']:<20}"
+        old = baseline.get(key(record))
+        for column in columns:
+            value = record[column]
+            text = f"{value:.3f}" if isinstance(value, float) else str(value)
+            if old is not None and old[column]:
+                text += f" ({(value - old[column]) / old[column]:+.0%})"
+            line += f"{text:>22}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--seeds", default="0")
+    parser.add_argument("--oracles", default=",".join(oracles))
+    parser.add_argument("--strategies", default=",".join(strategies))
+    parser.add_argument("--prepass", action="store_true", help="use the coarse prepass")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=results_dir / f"{pysource_minimize.version}.json",
+    )
+    parser.add_argument(
+        "--compare", type=Path, help="results of a previous run to compare with"
+    )
+    args = parser.parse_args()
+
+    records = []
+    for size in map(int, args.sizes.split(",")):
+        for seed in map(int, args.seeds.split(",")):
+            for oracle_name in args.oracles.split(","):
+                for strategy_name in args.strategies.split(","):
+                    record = run(size, seed, oracle_name, strategy_name, args.prepass)
+                    records.append(record)
+                    print(json.dumps(record), file=sys.stderr)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+
+    print_table(records, baseline)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(
+            {
+                "version": pysource_minimize.version,
+                "python": platform.python_version(),
+                "results": records,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+fixed-seed sources and synthetic oracles for the benchmarks
+"""
+
+import ast
+import warnings
+
+from pysource_codegen import generate
+from pysource_minimize._utils import unparse
+
+needle_names = ("needle_17597", "needle_27109")
+
+
+def node_count(tree):
+    return sum(1 for _ in ast.walk(tree))
+
+
+def compiles(source):
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", SyntaxWarning)
+            compile(source, "<string>", "exec")
+    except Exception:
+        return False
+    return True
+
+
+def generate_tree(size: int, seed: int = 0) -> ast.Module:
+    """
+    generates a module with at least `size` nodes.
+
+    `pysource_codegen` can not generate arbitrary large modules,
+    the module is combined from the modules of consecutive seeds.
+    """
+    body = []
+    count = 0
+    seed *= 1000
+    while count < size:
+        source = generate(seed, node_limit=size, depth_limit=6)
+        seed += 1
+        if not compiles(source):
+            continue
+        module = ast.parse(source)
+        if any(isinstance(node, ast.Global) for node in ast.walk(module)):
+            # global declarations can conflict with the names of the other modules
+            continue
+        body += module.body
+        count += node_count(module)
+
+    return ast.Module(body=body, type_ignores=[])
+
+
+class _HideNeedle(ast.NodeTransformer):
+    def __init__(self, positions):
+        self.positions = positions
+        self.index = 0
+
+    def generic_visit(self, node):
+        if isinstance(node, ast.expr):
+            name = self.positions.get(self.index)
+            self.index += 1
+            if name is not None:
+                return ast.Name(id=name, ctx=ast.Load())
+        return super().generic_visit(node)
+
+
+def hide_needles(tree: ast.Module, count: int) -> str:
+    """
+    replaces `count` expressions which are evenly distributed over the tree with needles
+    """
+    expressions = sum(isinstance(node, ast.expr) for node in ast.walk(tree))
+
+    for offset in range(expressions):
+        positions = {
+            (expressions * (i + 1) // (count + 1) + offset) % expressions: name
+            for i, name in enumerate(needle_names[:count])
+        }
+        try:
+            source = unparse(_HideNeedle(positions).visit(_copy(tree)))
+        except Exception:
+            continue
+        if compiles(source) and needle_oracle(count)(source):
+            return source
+
+    raise ValueError("needles can not be hidden in this tree")
+
+
+def _copy(tree):
+    return ast.parse(unparse(tree))
+
+
+def needle_oracle(count: int):
+    """
+    the source has to contain every needle exactly once
+    """
+    names = needle_names[:count]
+
+    def oracle(source):
+        found = [
+            node.id
+            for node in ast.walk(ast.parse(source))
+            if isinstance(node, ast.Name) and node.id in names
+        ]
+        return sorted(found) == sorted(names)
+
+    return oracle
+
+
+oracles = {
+    "needle": 1,
+    "two-needles": 2,
+}
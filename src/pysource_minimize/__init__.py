@@ -1,9 +1,36 @@
+from ._flaky import FlakyChecker
 from ._minimize import CouldNotMinimize
+from ._minimize import iter_minimize
 from ._minimize import minimize
 from ._minimize import minimize_all
+from ._minimize import minimize_many
+from ._minimize import minimize_tree
 from ._minimize_base import StopMinimization
+from ._service import MinimizeClient
+from ._service import MinimizeService
+from ._service import MinimizeWorker
+from ._service import ServiceError
+from ._stats import Stats
+from ._trace import JsonlTracer
+from ._trace import Tracer
 
-__all__ = ("minimize", "minimize_all", "CouldNotMinimize", "StopMinimization")
+__all__ = (
+    "minimize",
+    "minimize_all",
+    "minimize_many",
+    "minimize_tree",
+    "iter_minimize",
+    "CouldNotMinimize",
+    "StopMinimization",
+    "FlakyChecker",
+    "Stats",
+    "Tracer",
+    "JsonlTracer",
+    "MinimizeService",
+    "MinimizeWorker",
+    "MinimizeClient",
+    "ServiceError",
+)
 
 
 version = "0.10.1"
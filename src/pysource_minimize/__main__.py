@@ -1,6 +1,12 @@
+import glob
+import json
+import os
 import pathlib
-import subprocess as sp
+import shutil
 import sys
+import tempfile
+import time
+from functools import lru_cache
 
 try:
     import click
@@ -20,6 +26,9 @@ except ModuleNotFoundError:
 
 
 from ._minimize import minimize_all
+from ._oracle import Oracle
+from ._zygote import parse_python_command
+from ._zygote import Zygote
 
 
 def num_equal_lines(a: str, b: str):
@@ -39,6 +48,78 @@ def num_equal_lines(a: str, b: str):
     return start, end
 
 
+def invalidate_bytecode(path: pathlib.Path):
+    """
+    removes the cached bytecode of the module at `path`.
+
+    The bytecode of the other modules is kept, because it is still valid.
+    """
+    cache_dirs = [path.parent / "__pycache__"]
+
+    prefix = os.environ.get("PYTHONPYCACHEPREFIX")
+    if prefix:
+        cache_dirs.append(pathlib.Path(prefix, *path.parent.resolve().parts[1:]))
+
+    for cache_dir in cache_dirs:
+        # all interpreters and optimization levels (bug.cpython-312.opt-1.pyc)
+        for pyc in cache_dir.glob(f"{glob.escape(path.stem)}.*.pyc"):
+            pyc.unlink(missing_ok=True)
+
+
+def create_scratch_workspace(root: pathlib.Path, files) -> pathlib.Path:
+    """
+    mirrors `root` into a new directory in memory (/dev/shm if it is available).
+
+    The `files` are copied and the directories which contain them are created.
+    Everything else is linked to the original location.
+    """
+    root = root.resolve()
+    files = {f.resolve() for f in files}
+    for f in files:
+        if root not in f.parents:
+            raise ValueError(
+                f"--scratch requires that all files are inside the current directory ({f})"
+            )
+    directories = {d for f in files for d in f.parents}
+
+    shm = pathlib.Path("/dev/shm")
+    workspace = pathlib.Path(
+        tempfile.mkdtemp(
+            prefix="pysource-minimize-",
+            dir=shm if shm.is_dir() and os.access(shm, os.W_OK) else None,
+        )
+    )
+
+    def mirror(source: pathlib.Path, target: pathlib.Path):
+        for entry in source.iterdir():
+            if entry in files:
+                shutil.copyfile(entry, target / entry.name)
+            elif entry in directories:
+                (target / entry.name).mkdir()
+                mirror(entry, target / entry.name)
+            elif entry.name != "__pycache__":
+                (target / entry.name).symlink_to(entry)
+
+    mirror(root, workspace)
+    return workspace
+
+
+# the screen is refreshed by a separate thread with this rate
+refresh_per_second = 10
+
+
+class Lazy:
+    """
+    renderable which is created when the screen is refreshed
+    """
+
+    def __init__(self, render):
+        self.render = render
+
+    def __rich__(self):
+        return self.render()
+
+
 def escape_markdown(s: str) -> str:
     return s.replace("_", "\\_")
 
@@ -60,9 +141,20 @@ def escape_markdown(s: str) -> str:
 )
 @click.option(
     "--track",
-    required=True,
     help="string which should be in the stdout/stderr of the command during minimization",
 )
+@click.option(
+    "regex",
+    "--regex",
+    is_flag=True,
+    help="--track is a regular expression",
+)
+@click.option(
+    "returncode",
+    "--returncode",
+    type=int,
+    help="the exit code which the command should return during minimization",
+)
 @click.option(
     "write_back", "-w", "--write", is_flag=True, help="write minimized output to file"
 )
@@ -73,52 +165,126 @@ def escape_markdown(s: str) -> str:
     is_flag=True,
     help="format the file with black to provide better output for complex files",
 )
+@click.option(
+    "no_ui",
+    "--no-ui",
+    is_flag=True,
+    help="print one json line for every check instead of showing the code",
+)
+@click.option(
+    "preload",
+    "--preload",
+    multiple=True,
+    help="module which is imported once by a python process which forks itself for every check."
+    " The command has to be 'python -m module ...' or 'python script.py ...'."
+    " The module should not import the files which are minimized",
+)
+@click.option(
+    "scratch",
+    "--scratch",
+    is_flag=True,
+    help="run the command in a copy of the current directory in memory (/dev/shm)."
+    " The files are only written back at the end",
+)
 @click.argument("cmd", nargs=-1)
-def main(cmd, files, dirs, track, write_back, format):
+def main(
+    cmd,
+    files,
+    dirs,
+    track,
+    regex,
+    returncode,
+    write_back,
+    format,
+    no_ui,
+    preload,
+    scratch,
+):
     if not files and not dirs:
         print("either --dir or --file is required")
         exit(1)
 
+    if track is None and returncode is None:
+        print("either --track or --returncode is required")
+        exit(1)
+
+    oracle = Oracle(track, regex=regex, returncode=returncode)
+
     files = [pathlib.Path(f) for f in files]
 
     for directory in dirs:
         files += list(pathlib.Path(directory).rglob("*.py"))
 
-    def is_on_track():
-        result = sp.run(cmd, capture_output=True)
-        return track in (result.stdout.decode() + result.stderr.decode())
+    if scratch:
+        try:
+            workspace = create_scratch_workspace(pathlib.Path.cwd(), files)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        click.get_current_context().call_on_close(
+            lambda: shutil.rmtree(workspace, ignore_errors=True)
+        )
+
+        def location(path):
+            return workspace / path.resolve().relative_to(pathlib.Path.cwd().resolve())
+
+    else:
+        workspace = None
+
+        def location(path):
+            return path
+
+    if preload:
+        try:
+            python, args = parse_python_command(list(cmd))
+        except ValueError as e:
+            raise click.UsageError(str(e))
+
+        zygote = Zygote(python, list(preload), cwd=workspace)
+        click.get_current_context().call_on_close(zygote.close)
+
+        def is_on_track():
+            return oracle.matches(zygote.run(args))
+
+    else:
+
+        def is_on_track():
+            return oracle.run(list(cmd), cwd=workspace)
 
     if not is_on_track():
         print("I don't know what you want to minimize for.")
-        print(
-            f"'{track}' is not a string which in the stdout/stderr of '{' '.join(cmd)}'"
-        )
+        if track is not None:
+            print(
+                f"'{track}' is not a string which in the stdout/stderr of '{' '.join(cmd)}'"
+            )
+        if returncode is not None:
+            print(f"'{' '.join(cmd)}' does not exit with {returncode}")
         sys.exit(1)
 
     original_sources = {f: f.read_text(encoding="utf-8") for f in files}
     console = Console()
-    syntax = Syntax(list(original_sources.values())[0], "python", line_numbers=True)
-
-    syntax_panel = Panel(syntax, title_align="left")
 
     check_count = 0
 
     last_minimized_sources = {}
 
-    def refresh():
-        live.refresh()
+    # (filename, source, last minimized source) of the current check
+    current_check = None
 
-    def safe(path, source):
+    def write(path, source):
         if source is None:
             path.unlink(missing_ok=True)
         else:
             path.write_text(source, encoding="utf-8")
 
-        import shutil
+        invalidate_bytecode(path)
 
-        cache = path.parent / "__pycache__"
-        if cache.exists():
-            shutil.rmtree(cache)
+    def safe(path, source):
+        write(location(path), source)
+
+    def restore_original_sources():
+        if workspace is None:
+            for path, original_source in original_sources.items():
+                path.write_text(original_source, encoding="utf-8")
 
     def format_source(source):
         if source is None:
@@ -136,69 +302,101 @@ def main(cmd, files, dirs, track, write_back, format):
 
         return source, formatted
 
-    def checker(sources, filename):
-        nonlocal last_minimized_sources
-        nonlocal check_count
+    @lru_cache(maxsize=16)
+    def format_display_source(source):
+        return format_source(source)
 
-        info = ""
-        formatted = False
-        display_source = ""
-        for path, current_source in sources.items():
-            current_source, current_source_formatted = format_source(current_source)
+    def render_code():
+        # called by the refresh thread of Live and not for every check
+        if current_check is None:
+            filename = next(iter(original_sources))
+            source = last_source = original_sources[filename]
+        else:
+            filename, source, last_source = current_check
 
-            if not current_source_formatted and format:
-                info = "(formatting failed)"
+        if source is None:
+            return Panel("<deleted>", title=str(filename), title_align="left")
 
-            if path == filename:
-                formatted = current_source_formatted
-                display_source = current_source
+        if last_source is None:
+            last_source = source
 
-            safe(path, current_source)
+        source, formatted = format_display_source(source)
+        last_source, _ = format_display_source(last_source)
 
-        on_track = is_on_track()
+        # show the last minimized source and highlight the lines which are tested
+        equal_lines_start, equal_lines_end = num_equal_lines(last_source, source)
+        num_lines = len(last_source.splitlines())
+        start_line = (
+            max(equal_lines_start - 2, 0) if num_lines > console.size.height - 2 else 0
+        )
 
-        check_count += 1
-        layout["info"].update(f"test {check_count} {info}")
-        syntax_panel.title = str(filename)
+        syntax = Syntax(
+            last_source,
+            "python",
+            line_numbers=True,
+            word_wrap=formatted,
+            line_range=(start_line, None),
+            highlight_lines={
+                n for n in range(equal_lines_start + 1, num_lines - equal_lines_end + 1)
+            },
+        )
 
-        last_minimized_source = last_minimized_sources.get(filename, "")
-        current_source = sources[filename]
+        title = str(filename)
+        if format and not formatted:
+            title += " (formatting failed)"
 
-        if current_source is None:
-            syntax.code = f"<deleted>"
-            live.refresh()
+        return Panel(syntax, title=title, title_align="left")
 
-        else:
-            assert last_minimized_source is not None
+    def render_info():
+        if check_count == 0:
+            return "start testing ..."
+        return f"test {check_count}"
 
-            equal_lines_start, equal_lines_end = num_equal_lines(
-                last_minimized_source, current_source
-            )
-            num_lines = len(last_minimized_source.splitlines())
-            start_line = (
-                equal_lines_start - 2 if num_lines > console.size.height - 2 else 0
-            )
+    # the sources which are currently written to the filesystem
+    sources = {}
 
-            if not on_track:
+    def checker(changes, filename):
+        nonlocal last_minimized_sources
+        nonlocal check_count
+        nonlocal current_check
 
-                num_lines = len(last_minimized_source.splitlines())
+        for path, current_source in changes.items():
+            safe(path, current_source)
 
-                syntax.highlight_lines = {
-                    n
-                    for n in range(
-                        equal_lines_start + 1, num_lines - equal_lines_end + 1
-                    )
-                }
+        sources.update(changes)
 
-                syntax.line_range = (start_line, None)
+        current_source = sources[filename]
+        current_check = (
+            filename,
+            current_source,
+            last_minimized_sources.get(filename),
+        )
 
-                live.refresh()
+        if sources == last_minimized_sources:
+            return True
 
-            if sources == last_minimized_sources:
-                return True
+        checker_start = time.perf_counter()
+        on_track = is_on_track()
+        checker_time = time.perf_counter() - checker_start
 
-            syntax.word_wrap = formatted
+        check_count += 1
+
+        if no_ui:
+            print(
+                json.dumps(
+                    {
+                        "check": check_count,
+                        "file": str(filename),
+                        "verdict": on_track,
+                        "size": None if current_source is None else len(current_source),
+                        "elapsed": checker_start + checker_time - start_time,
+                        "checker_time": checker_time,
+                    }
+                ),
+                flush=True,
+            )
 
+        elif current_source is not None:
             original_source = original_sources[filename]
             progress.update(
                 task,
@@ -206,58 +404,84 @@ def main(cmd, files, dirs, track, write_back, format):
                 total=len(original_source),
             )
 
-            syntax.highlight_lines = {
-                n for n in range(equal_lines_start + 1, num_lines - equal_lines_end + 1)
-            }
-
-            if syntax.line_range is None or start_line != syntax.line_range[0]:
-                syntax.line_range = (start_line, None)
-                refresh()
-
-            syntax.code = display_source
-
-            num_lines = len(current_source.splitlines())
+        if on_track:
+            last_minimized_sources = dict(sources)
+        return on_track
 
-            syntax.highlight_lines = {
-                n for n in range(equal_lines_start + 1, num_lines - equal_lines_end + 1)
-            }
+    def checked_format(new_sources):
+        """
+        the formatted sources if they still reproduce the problem, otherwise the minimized sources
+        """
+        if not format:
+            return new_sources
 
-            refresh()
+        formatted_sources = {
+            path: format_source(source)[0] for path, source in new_sources.items()
+        }
+        if formatted_sources == new_sources:
+            return new_sources
 
-        if on_track:
-            last_minimized_sources = sources
-        return on_track
+        filename = next(iter(new_sources))
+        if checker(formatted_sources, filename):
+            return formatted_sources
+        return new_sources
 
     sponsoring_notification = Align(
         "You can support my work by sponsoring me on GitHub [blue link=https://github.com/sponsors/15r10nk][red]:heart:[/red] github.com/sponsors/15r10nk [/]",
         align="center",
     )
 
-    progress = Progress()
-    layout = Layout()
-    layout.split_column(
-        Layout(name="progress", size=1),
-        Layout(name="info", size=1),
-        Layout(name="code"),
-        Layout(
-            sponsoring_notification,
-            size=1,
-        ),
-    )
+    start_time = time.perf_counter()
 
-    layout["progress"].update(progress)
-    layout["code"].update(syntax_panel)
-    layout["info"].update("start testing ...")
+    try:
+        if no_ui:
+            new_sources = minimize_all(original_sources, checker, retries=1, delta=True)
+        else:
+            progress = Progress()
+            layout = Layout()
+            layout.split_column(
+                Layout(name="progress", size=1),
+                Layout(name="info", size=1),
+                Layout(name="code"),
+                Layout(
+                    sponsoring_notification,
+                    size=1,
+                ),
+            )
 
-    with Live(layout, auto_refresh=False, screen=True) as live:
-        task = progress.add_task("minimize")
+            layout["progress"].update(progress)
+            layout["code"].update(Lazy(render_code))
+            layout["info"].update(Lazy(render_info))
 
-        try:
-            new_sources = minimize_all(original_sources, checker, retries=1)
-        except KeyboardInterrupt:
-            for path, original_source in original_sources.items():
-                path.write_text(original_source, encoding="utf-8")
-            return 1
+            with Live(layout, refresh_per_second=refresh_per_second, screen=True):
+                task = progress.add_task("minimize")
+                new_sources = minimize_all(
+                    original_sources, checker, retries=1, delta=True
+                )
+    except KeyboardInterrupt:
+        restore_original_sources()
+        return 1
+
+    if no_ui:
+        if write_back:
+            new_sources = checked_format(new_sources)
+            for path, new_source in new_sources.items():
+                write(path, new_source)
+        else:
+            restore_original_sources()
+
+        print(
+            json.dumps(
+                {
+                    "result": {
+                        str(path): new_source
+                        for path, new_source in new_sources.items()
+                    },
+                    "saved": write_back,
+                }
+            )
+        )
+        return
 
     console.print(sponsoring_notification)
     console.print()
@@ -303,14 +527,13 @@ def main(cmd, files, dirs, track, write_back, format):
             f"Do you want to write the minimized code to the filesystem?", default=False
         )
     ):
+        new_sources = checked_format(new_sources)
         for path, new_source in new_sources.items():
-            new_source, _ = format_source(new_source)
-            safe(path, new_source)
+            write(path, new_source)
 
         console.print("minimized files saved")
     else:
-        for path, original_source in original_sources.items():
-            path.write_text(original_source, encoding="utf-8")
+        restore_original_sources()
 
         console.print("original files restored")
 
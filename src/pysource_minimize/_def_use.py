@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import ast
+
+
+def defined_names(stmt):
+    """
+    names which are bound by the statement (imports, defs and assignments)
+    """
+    if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        return [
+            alias.asname or alias.name.split(".")[0]
+            for alias in stmt.names
+            if alias.name != "*"
+        ]
+    elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [stmt.name]
+    elif isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+        targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+        return [
+            n.id
+            for target in targets
+            for n in ast.walk(target)
+            if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)
+        ]
+    return []
+
+
+class DefUseIndex:
+    """
+    maps definitions to the statements which use the defined names.
+
+    The index is name based and ignores scopes.
+    It is only used to propose removals, the checker decides if they are valid.
+    """
+
+    def __init__(self, tree: ast.AST):
+        self.defs: dict[str, list[ast.stmt]] = {}
+        self.uses: dict[str, list[tuple[ast.stmt, ast.Name]]] = {}
+        self.parents: dict[ast.stmt, tuple[ast.stmt, ...]] = {}
+
+        def visit(node, parents):
+            if isinstance(node, ast.stmt):
+                self.parents[node] = parents
+                for name in defined_names(node):
+                    self.defs.setdefault(name, []).append(node)
+                parents = (*parents, node)
+
+            if parents and isinstance(node, ast.Name):
+                if not isinstance(node.ctx, ast.Store) or any(
+                    isinstance(p, ast.AugAssign) and p.target is node for p in parents
+                ):
+                    self.uses.setdefault(node.id, []).append((parents[-1], node))
+
+            for child in ast.iter_child_nodes(node):
+                visit(child, parents)
+
+        visit(tree, ())
+
+    def dangling_uses(self, stmt, is_live):
+        """
+        returns the statements which would use an undefined name after `stmt` is removed
+        """
+        result = []
+        for name in defined_names(stmt):
+            if any(d is not stmt and is_live(d) for d in self.defs[name]):
+                # the name is still defined somewhere else
+                continue
+
+            for use_stmt, name_node in self.uses.get(name, []):
+                if (
+                    use_stmt is stmt
+                    or stmt in self.parents[use_stmt]
+                    or use_stmt in self.parents[stmt]
+                ):
+                    continue
+                if is_live(name_node) and is_live(use_stmt):
+                    if use_stmt not in result:
+                        result.append(use_stmt)
+
+        return result
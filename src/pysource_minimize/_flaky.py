@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import ast
+from collections.abc import Callable
+from typing import Any
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(
+            sorted(((k, _freeze(v)) for k, v in value.items()), key=lambda i: str(i[0]))
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class FlakyChecker:
+    """
+    wraps the checker of a problem which can not be reproduced every time.
+
+    Only rejections which contradict an earlier verdict are checked again:
+    a candidate which was accepted before reproduces the problem,
+    and it is checked again until it is accepted, `max_repeats` is reached
+    or the rejections are unlikely to be flakes (with the probability `confidence`).
+
+    The candidates are compared by their full state: the source for `minimize()`,
+    all files for `minimize_all()` (also with `delta=True`) and `ast.dump()` for `minimize_tree()`.
+
+    Example:
+        ``` python
+        checker = FlakyChecker(checker, confidence=0.99, max_repeats=5)
+        minimize(source, checker, retries=3)
+        print(checker.flake_rate)
+        ```
+
+    Args:
+        checker: the checker which is passed to `minimize()`, `minimize_all()` or `minimize_tree()`
+        confidence: the required probability that a rejected candidate which was accepted before really does not reproduce the problem.
+        max_repeats: the maximal number of times a rejected candidate is checked again.
+    """
+
+    def __init__(
+        self,
+        checker: Callable[..., bool],
+        *,
+        confidence: float = 0.95,
+        max_repeats: int = 3,
+    ):
+        self.checker = checker
+        self.confidence = confidence
+        self.max_repeats = max_repeats
+
+        self.accepted: set[Any] = set()
+        # the number of rejections of the candidates which were never accepted
+        self.rejected: dict[Any, int] = {}
+        # the files of minimize_all(), the checker gets only the changed files with delta=True
+        self.files: dict[Any, Any] = {}
+
+        self.evaluations = 0
+        self.repeats = 0
+
+        # evaluations of candidates which are known to reproduce the problem
+        self.known_good_evaluations = 0
+        # rejections of candidates which are known to reproduce the problem
+        self.flakes = 0
+
+    @property
+    def flake_rate(self) -> float:
+        """the observed probability that a candidate which reproduces the problem is rejected"""
+        if not self.known_good_evaluations:
+            return 0.0
+        return self.flakes / self.known_good_evaluations
+
+    def _key(self, candidate):
+        if isinstance(candidate, ast.AST):
+            return ast.dump(candidate)
+        if isinstance(candidate, dict):
+            self.files.update(candidate)
+            return _freeze(self.files)
+        return candidate
+
+    def _check(self, args):
+        self.evaluations += 1
+        return self.checker(*args)
+
+    def __call__(self, *args) -> bool:
+        # the first argument is the candidate, the others are only informational
+        key = self._key(args[0])
+        known_good = key in self.accepted
+
+        rejections = 0
+        while True:
+            result = self._check(args)
+
+            if known_good:
+                self.known_good_evaluations += 1
+                if not result:
+                    self.flakes += 1
+
+            if result:
+                if not known_good:
+                    self.accepted.add(key)
+                    # the rejections before are now known to be wrong
+                    wrong = self.rejected.pop(key, 0)
+                    self.known_good_evaluations += wrong + 1
+                    self.flakes += wrong
+                return True
+
+            if not known_good:
+                # nothing contradicts the rejection
+                self.rejected[key] = self.rejected.get(key, 0) + 1
+                return False
+
+            rejections += 1
+
+            if rejections > self.max_repeats:
+                return False
+
+            if self.flake_rate**rejections <= 1 - self.confidence:
+                return False
+
+            self.repeats += 1
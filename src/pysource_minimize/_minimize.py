@@ -1,14 +1,34 @@
 from __future__ import annotations
 
 import ast
+import copy
+import hashlib
+import multiprocessing
+import queue
+import threading
+import time
 import warnings
 from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any
 
+from ._minimize_base import AbortMinimization
 from ._minimize_base import equal_ast
+from ._minimize_base import MinimizeBase
+from ._minimize_base import StopMinimization
+from ._minimize_cost import MinimizeCost
 from ._minimize_structure import MinimizeStructure
 from ._minimize_unique_name import MinimizeUniqueName
 from ._minimize_value import MinimizeValue
+from ._prepass import CoarsePrepass
+from ._stats import measure
+from ._stats import Stats
+from ._token_pass import TokenPass
+from ._trace import Tracer
 from ._utils import parse
 from ._utils import unparse
 
@@ -22,6 +42,14 @@ def minimize_ast(
     progress_callback=lambda current, total: None,
     retries=1,
     strategies=default_strategies,
+    stats: Stats | None = None,
+    tracer: Tracer | None = None,
+    low_memory: bool = False,
+    memory_limit: int | None = None,
+    prepass: bool = False,
+    memo: bool = False,
+    reduce_latency: float | None = None,
+    copy_candidates: bool = False,
 ) -> ast.AST:
     """
     minimizes the AST
@@ -31,6 +59,14 @@ def minimize_ast(
         checker: a function which gets the ast and returns `True` when the criteria is fulfilled.
         progress_callback: function which is called everytime the ast gets a bit smaller.
         retries: the number of retries which should be performed when the ast could be minimized (useful for non deterministic issues)
+        stats: collects statistics about the minimization
+        tracer: gets notified about the progress of the minimization
+        low_memory: use less memory for large sources
+        memory_limit: stop the minimization and return the current result when the process uses more memory (in bytes)
+        prepass: remove whole statements with cheap checks before the strategies are used
+        memo: remember the failed transformations and skip them until the enclosing scope changes
+        reduce_latency: reduce the values which make the checks slow before the first round, while the checks take longer than this (in seconds)
+        copy_candidates: the checker gets copies of the candidates of the prepass (the other candidates are always new trees)
 
     returns the minimized ast
     """
@@ -38,13 +74,89 @@ def minimize_ast(
     last_success = 0
 
     current_ast = original_ast
+
+    # the failed transformations of all rounds and strategies
+    failures: set | None = set() if memo else None
+
+    if prepass:
+        if tracer is not None:
+            tracer.on_strategy_start(
+                strategy=CoarsePrepass.__name__,
+                size=MinimizeBase.nodes_of(current_ast),
+                time=time.perf_counter(),
+            )
+        coarse_prepass = CoarsePrepass(
+            current_ast,
+            checker,
+            stats=stats,
+            tracer=tracer,
+            copy_candidates=copy_candidates,
+        )
+        current_ast = coarse_prepass.tree
+        if tracer is not None:
+            tracer.on_strategy_end(
+                strategy=CoarsePrepass.__name__,
+                size=MinimizeBase.nodes_of(current_ast),
+                time=time.perf_counter(),
+            )
+        if coarse_prepass.stop:
+            return current_ast
+
+    def run_strategy(Minimizer, tree, memo, **options):
+        if tracer is not None:
+            tracer.on_strategy_start(
+                strategy=Minimizer.__name__,
+                size=MinimizeBase.nodes_of(tree),
+                time=time.perf_counter(),
+            )
+        minimizer = Minimizer(
+            tree,
+            checker,
+            progress_callback,
+            stats=stats,
+            tracer=tracer,
+            low_memory=low_memory,
+            memory_limit=memory_limit,
+            memo=memo,
+            **options,
+        )
+        tree = minimizer.get_current_tree({})
+        stop, aborted = minimizer.stop, minimizer.aborted
+        # the working copy of the strategy is not needed any more
+        del minimizer
+
+        if tracer is not None:
+            tracer.on_strategy_end(
+                strategy=Minimizer.__name__,
+                size=MinimizeBase.nodes_of(tree),
+                time=time.perf_counter(),
+            )
+        return tree, stop, aborted
+
+    if reduce_latency is not None:
+        # the expensive values are reduced once, before the first round
+        current_ast, stop, aborted = run_strategy(
+            MinimizeCost, current_ast, None, min_latency=reduce_latency
+        )
+        if stop:
+            return current_ast
+
+    round_number = 0
     while last_success <= retries:
+        if tracer is not None:
+            tracer.on_round(
+                round=round_number,
+                size=MinimizeBase.nodes_of(current_ast),
+                time=time.perf_counter(),
+            )
+
         new_ast = current_ast
 
-        for Minimizer in default_strategies:
-            minimizer = Minimizer(new_ast, checker, progress_callback)
-            new_ast = minimizer.get_current_tree({})
-            if minimizer.stop:
+        for Minimizer in strategies:
+            new_ast, stop, aborted = run_strategy(Minimizer, new_ast, failures)
+            if aborted:
+                return new_ast
+            if stop:
                 break
 
         minimized_something = not equal_ast(new_ast, current_ast)
@@ -56,13 +168,135 @@ def minimize_ast(
         else:
             last_success += 1
 
+        round_number += 1
+
     return current_ast
 
 
+def _source_checker(checker, *, compilable, with_code=False, stats=None):
+    """
+    converts a checker for source code into a checker for ASTs
+    """
+
+    def source_checker(new_ast):
+        try:
+            with warnings.catch_warnings():
+                with measure(stats, "unparse"):
+                    source = unparse(new_ast)
+                warnings.simplefilter("ignore", SyntaxWarning)
+                if compilable:
+                    with measure(stats, "compile"):
+                        # the `from __future__ import annotations` of this module should not be inherited
+                        code = compile(source, "<string>", "exec", dont_inherit=True)
+        except:
+            return False
+
+        with measure(stats, "checker"):
+            if with_code:
+                return checker(source, code)
+            return checker(source)
+
+    return source_checker
+
+
 class CouldNotMinimize(ValueError):
     """Raised to indicate that the source code could not be minimized."""
 
 
+def _tree_checker(checker, *, compilable, stats=None):
+    """
+    filters the candidates which can not be compiled without unparsing them
+    """
+
+    def tree_checker(new_ast):
+        if compilable:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", SyntaxWarning)
+                    with measure(stats, "compile"):
+                        ast.fix_missing_locations(new_ast)
+                        compile(new_ast, "<ast>", "exec", dont_inherit=True)
+            except:
+                return False
+
+        with measure(stats, "checker"):
+            return checker(new_ast)
+
+    return tree_checker
+
+
+def minimize_tree(
+    tree: ast.Module,
+    checker: Callable[[ast.Module], bool],
+    *,
+    retries: int = 1,
+    compilable: bool = False,
+    stats: Stats | None = None,
+    tracer: Tracer | None = None,
+    low_memory: bool = False,
+    memory_limit: int | None = None,
+    prepass: bool = False,
+    memo: bool = False,
+    reduce_latency: float | None = None,
+) -> ast.Module:
+    """
+    minimizes the ast without unparsing it
+
+    Args:
+        tree: the ast to minimize, it is not modified.
+        checker: a function which gets the candidate ast and returns `True` when the criteria is fulfilled.
+            The candidates should not be modified by the checker.
+        retries: the number of retries which should be performed when the ast could be minimized (useful for non deterministic issues)
+        compilable: only pass candidates to the checker which can be compiled with `compile()`.
+        stats: a `Stats` object which collects statistics about the minimization.
+        tracer: a `Tracer` which gets notified about every attempt (see `JsonlTracer`).
+        low_memory: use less memory for large trees (the locations of the ast nodes are not kept).
+        memory_limit: stop the minimization and return the current result when the process uses more memory (in bytes).
+        prepass: remove whole top-level statements and statements of class/function bodies with cheap checks
+            before the strategies are used (useful for large trees).
+        memo: remember which transformations failed and skip them in the following rounds
+            until the enclosing function/class/module of the transformed node changes.
+            This saves checks when `retries` is used but should not be used with non-deterministic checkers.
+        reduce_latency: reduce loop bounds, repetition counts and large literals first,
+            while the checks take longer than this number of seconds (e.g. `0.01`).
+            This makes the following checks and the final reproducer faster.
+
+    returns the minimized ast
+    """
+
+    tree_checker = _tree_checker(checker, compilable=compilable, stats=stats)
+
+    if stats is not None:
+        stats.attempt("original", type(tree).__name__)
+
+    if not tree_checker(copy.deepcopy(tree)):
+        raise CouldNotMinimize(
+            "Tree cannot be minimized: the checker returned False for the original ast"
+        )
+
+    minimized_ast = minimize_ast(
+        tree,
+        tree_checker,
+        retries=retries,
+        stats=stats,
+        tracer=tracer,
+        low_memory=low_memory,
+        memory_limit=memory_limit,
+        prepass=prepass,
+        memo=memo,
+        reduce_latency=reduce_latency,
+        # the checker could modify the candidates
+        copy_candidates=True,
+    )
+
+    minimized_ast = copy.deepcopy(minimized_ast)
+    assert isinstance(minimized_ast, ast.Module)
+    for node in ast.walk(minimized_ast):
+        # the index is an implementation detail of the strategies
+        node.__dict__.pop("_MinimizeBase__index", None)
+    return minimized_ast
+
+
 def _minimize_source(
     source: str,
     checker: Callable[[str], bool],
@@ -71,6 +305,15 @@ def _minimize_source(
     retries: int = 1,
     compilable=True,
     strategies=default_strategies,
+    stats: Stats | None = None,
+    tracer: Tracer | None = None,
+    low_memory: bool = False,
+    memory_limit: int | None = None,
+    prepass: bool = False,
+    memo: bool = False,
+    reduce_latency: float | None = None,
+    token_pass: bool = False,
+    with_code: bool = False,
 ) -> str:
     """
     minimizes the source code
@@ -81,23 +324,30 @@ def _minimize_source(
         progress_callback: function which is called everytime the source gets a bit smaller.
         retries: the number of retries which should be performed when the ast could be minimized (useful for non deterministic issues)
         compilable: make sure that the minimized code can also be compiled and not just parsed.
+        stats: collects statistics about the minimization
+        tracer: gets notified about the progress of the minimization
+        low_memory: use less memory for large sources
+        memory_limit: stop the minimization and return the current result when the process uses more memory (in bytes)
+        prepass: remove whole statements with cheap checks before the strategies are used
+        memo: skip transformations which failed before until the enclosing scope changes
+        reduce_latency: reduce the values which make the checks slow before the first round, while the checks take longer than this (in seconds)
+        token_pass: minimize the result further on the token level
+        with_code: the checker gets the compiled code object as second argument
 
     returns the minimized source
     """
 
+    if with_code and not compilable:
+        raise ValueError("with_code=True requires compilable=True")
+
     original_ast = parse(source)
 
-    def source_checker(new_ast):
-        try:
-            with warnings.catch_warnings():
-                source = unparse(new_ast)
-                warnings.simplefilter("ignore", SyntaxWarning)
-                if compilable:
-                    compile(source, "<string>", "exec")
-        except:
-            return False
+    source_checker = _source_checker(
+        checker, compilable=compilable, with_code=with_code, stats=stats
+    )
 
-        return checker(source)
+    if stats is not None:
+        stats.attempt("roundtrip", type(original_ast).__name__)
 
     if not source_checker(original_ast):
         raise CouldNotMinimize(
@@ -111,9 +361,23 @@ def _minimize_source(
         progress_callback=progress_callback,
         retries=retries,
         strategies=strategies,
+        stats=stats,
+        tracer=tracer,
+        low_memory=low_memory,
+        memory_limit=memory_limit,
+        prepass=prepass,
+        memo=memo,
+        reduce_latency=reduce_latency,
     )
 
-    return unparse(minimized_ast)
+    result = unparse(minimized_ast)
+
+    if token_pass:
+        result = TokenPass(
+            result, checker, compilable=compilable, with_code=with_code, stats=stats
+        ).source
+
+    return result
 
 
 def minimize(
@@ -123,6 +387,15 @@ def minimize(
     progress_callback: Callable[[int, int], object] = lambda current, total: None,
     retries: int = 1,
     compilable=True,
+    stats: Stats | None = None,
+    tracer: Tracer | None = None,
+    low_memory: bool = False,
+    memory_limit: int | None = None,
+    prepass: bool = False,
+    memo: bool = False,
+    reduce_latency: float | None = None,
+    token_pass: bool = False,
+    with_code: bool = False,
 ) -> str:
     """
     minimizes the source code
@@ -133,6 +406,22 @@ def minimize(
         progress_callback: (deprecated) function which is called everytime the source gets a bit smaller.
         retries: the number of retries which should be performed when the ast could be minimized (useful for non deterministic issues)
         compilable: make sure that the minimized code can also be compiled and not just parsed.
+        stats: a `Stats` object which collects statistics about the minimization.
+        tracer: a `Tracer` which gets notified about every attempt (see `JsonlTracer`).
+        low_memory: use less memory for large sources (the locations of the ast nodes are not kept).
+        memory_limit: stop the minimization and return the current result when the process uses more memory (in bytes).
+        prepass: remove whole top-level statements and statements of class/function bodies with cheap checks
+            before the strategies are used (useful for large sources).
+        memo: remember which transformations failed and skip them in the following rounds
+            until the enclosing function/class/module of the transformed node changes.
+            This saves checks when `retries` is used but should not be used with non-deterministic checkers.
+        reduce_latency: reduce loop bounds, repetition counts and large literals first,
+            while the checks take longer than this number of seconds (e.g. `0.01`).
+            This makes the following checks and the final reproducer faster.
+        token_pass: remove redundant parentheses and attribute names and shorten identifiers and literals
+            of the result on the token level. The candidates are validated with `compile()`.
+        with_code: the checker gets the code object of the candidate as second argument (`checker(source, code)`),
+            which can be executed without compiling the source again. Requires `compilable=True`.
 
     Warning:
         `progress_callback` is deprecated and should be implemented inside in `checker` where you can use the `len(source_code)`
@@ -146,15 +435,170 @@ def minimize(
         progress_callback=progress_callback,
         retries=retries,
         compilable=compilable,
+        stats=stats,
+        tracer=tracer,
+        low_memory=low_memory,
+        memory_limit=memory_limit,
+        prepass=prepass,
+        memo=memo,
+        reduce_latency=reduce_latency,
+        token_pass=token_pass,
+        with_code=with_code,
     )
 
 
+def iter_minimize(
+    source: str,
+    checker: Callable[[str], bool],
+    *,
+    retries: int = 1,
+    compilable=True,
+    stats: Stats | None = None,
+    tracer: Tracer | None = None,
+    low_memory: bool = False,
+    memory_limit: int | None = None,
+    prepass: bool = False,
+    memo: bool = False,
+    reduce_latency: float | None = None,
+    token_pass: bool = False,
+    with_code: bool = False,
+) -> Iterator[str]:
+    """
+    minimizes the source code like `minimize()`, but yields every smaller source as soon as it is found.
+
+    The last yielded source is the result of `minimize()`.
+    The transformations of the source run in a separate thread, but the checker is called
+    in the thread which iterates over the generator. Checkers which use `signal.alarm()` for timeouts
+    or thread-local state work like with `minimize()` (signal handlers require the main thread).
+    The tracer is called in the separate thread.
+    The minimization is stopped when the generator is closed.
+
+    Example:
+        ``` python
+        for new_source in iter_minimize(source, checker):
+            Path("reproducer.py").write_text(new_source)
+            if len(new_source) < 1000:
+                break
+        ```
+
+    Args:
+        source: the source code to minimize
+        checker: a function which gets the source and returns `True` when the criteria is fulfilled.
+        retries: the number of retries which should be performed when the ast could be minimized (useful for non deterministic issues)
+        compilable: make sure that the minimized code can also be compiled and not just parsed.
+        stats: a `Stats` object which collects statistics about the minimization.
+        tracer: a `Tracer` which gets notified about every attempt (see `JsonlTracer`).
+        low_memory: use less memory for large sources (the locations of the ast nodes are not kept).
+        memory_limit: stop the minimization and return the current result when the process uses more memory (in bytes).
+        prepass: remove whole top-level statements and statements of class/function bodies with cheap checks
+            before the strategies are used (useful for large sources).
+        memo: remember which transformations failed and skip them in the following rounds
+            until the enclosing function/class/module of the transformed node changes.
+            This saves checks when `retries` is used but should not be used with non-deterministic checkers.
+        reduce_latency: reduce loop bounds, repetition counts and large literals first,
+            while the checks take longer than this number of seconds (e.g. `0.01`).
+            This makes the following checks and the final reproducer faster.
+        token_pass: remove redundant parentheses and attribute names and shorten identifiers and literals
+            of the result on the token level. The candidates are validated with `compile()`.
+        with_code: the checker gets the code object of the candidate as second argument (`checker(source, code)`),
+            which can be executed without compiling the source again. Requires `compilable=True`.
+    """
+
+    # the candidates of the minimization thread and the verdicts of the calling thread
+    requests: queue.Queue = queue.Queue()
+    verdicts: queue.Queue = queue.Queue()
+    cancelled = threading.Event()
+
+    def remote_checker(*args):
+        if cancelled.is_set():
+            raise AbortMinimization()
+        requests.put(("check", args))
+        kind, value = verdicts.get()
+        if kind == "error":
+            raise value
+        return value
+
+    def run():
+        try:
+            result = minimize(
+                source,
+                remote_checker,
+                retries=retries,
+                compilable=compilable,
+                stats=stats,
+                tracer=tracer,
+                low_memory=low_memory,
+                memory_limit=memory_limit,
+                prepass=prepass,
+                memo=memo,
+                reduce_latency=reduce_latency,
+                token_pass=token_pass,
+                with_code=with_code,
+            )
+        except BaseException as e:
+            requests.put(("error", e))
+        else:
+            requests.put(("done", result))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    try:
+        # the first accepted source is the unchanged original
+        last = None
+        seen = None
+        while True:
+            kind, value = requests.get()
+            if kind == "error":
+                raise value
+            if kind == "done":
+                if value != last:
+                    yield value
+                return
+
+            new_source = value[0]
+            try:
+                result = checker(*value)
+            except StopMinimization as e:
+                # the candidate is accepted
+                verdicts.put(("error", e))
+                result = True
+            except BaseException as e:
+                verdicts.put(("error", e))
+                continue
+            else:
+                verdicts.put(("result", result))
+
+            if result:
+                if seen is not None and new_source != seen:
+                    last = new_source
+                    yield new_source
+                seen = new_source
+    finally:
+        cancelled.set()
+        # the minimization thread could wait for a verdict
+        verdicts.put(("error", AbortMinimization()))
+        thread.join()
+
+
 def minimize_all(
     sources: dict[Path, str],
     checker: Callable[[dict[Path, str | None], Path], bool],
     *,
     retries: int = 1,
     compilable=True,
+    independent: bool = False,
+    groups: Iterable[Iterable[Path]] | None = None,
+    jobs: int | None = None,
+    delta: bool = False,
+    stats: Stats | None = None,
+    tracer: Tracer | None = None,
+    low_memory: bool = False,
+    memory_limit: int | None = None,
+    prepass: bool = False,
+    memo: bool = False,
+    reduce_latency: float | None = None,
+    token_pass: bool = False,
 ) -> dict[Path, str | None]:
     """
     minimizes multiple source codes.
@@ -164,22 +608,103 @@ def minimize_all(
         checker: a function which gets the source and returns `True` when the criteria is fulfilled.
         retries: the number of retries which should be performed when the ast could be minimized (useful for non deterministic issues)
         compilable: make sure that the minimized code can also be compiled and not just parsed.
+        independent: every file can be minimized on its own (same as one group per file).
+        groups: a partition of the files into groups which can be minimized independent of each other.
+            The groups are minimized in parallel and the checker gets only the files of one group.
+            The checker has to be picklable in this case.
+        jobs: the number of processes which are used to minimize the groups (defaults to the number of cpus).
+        delta: the checker gets only the files which changed since the last call of the checker
+            (all files for the first call) instead of all files.
+        stats: a `Stats` object which collects statistics about the minimization.
+        tracer: a `Tracer` which gets notified about every attempt (see `JsonlTracer`).
+            The `size` of the file deletions is the number of the remaining files.
+            It can not be used together with groups.
+        low_memory: use less memory for large sources (the locations of the ast nodes are not kept).
+        memory_limit: stop the minimization and return the current result when the process uses more memory (in bytes).
+            The limit applies to every process when groups are used.
+        prepass: remove whole top-level statements and statements of class/function bodies with cheap checks
+            before the strategies are used (useful for large sources).
+        memo: remember which transformations failed and skip them in the following rounds
+            until the enclosing function/class/module of the transformed node changes.
+            This saves checks when `retries` is used but should not be used with non-deterministic checkers.
+        reduce_latency: reduce loop bounds, repetition counts and large literals first,
+            while the checks take longer than this number of seconds (e.g. `0.01`).
+            This makes the following checks and the final reproducer faster.
+        token_pass: remove redundant parentheses and attribute names and shorten identifiers and literals
+            of the result on the token level. The candidates are validated with `compile()`.
 
     Returns:
         a dict with the minimized sources. The values are `None` when the source file should be deleted
     """
 
+    if independent:
+        groups = [[path] for path in sources]
+
+    if groups is not None:
+        if tracer is not None:
+            raise ValueError("a tracer can not be used together with groups")
+        return _minimize_groups(
+            sources,
+            checker,
+            groups,
+            jobs=jobs,
+            retries=retries,
+            compilable=compilable,
+            delta=delta,
+            stats=stats,
+            low_memory=low_memory,
+            memory_limit=memory_limit,
+            prepass=prepass,
+            memo=memo,
+            reduce_latency=reduce_latency,
+            token_pass=token_pass,
+        )
+
     current_files: dict[Path, str | None] = dict(sources)
 
-    def run_files(strategies, retries):
+    if delta:
+        delta_checker = _DeltaChecker(checker)
+
+    def check(changes: dict[Path, str | None], current_file: Path) -> bool:
+        if delta:
+            return delta_checker(current_files, changes, current_file)
+        return checker({**current_files, **changes}, current_file)
+
+    def check_deletion(changes: dict[Path, str | None], current_file: Path) -> bool:
+        if stats is not None:
+            stats.attempt("delete files", "file")
+        if tracer is not None:
+            trace: dict[str, Any] = {
+                "strategy": "delete files",
+                "node_type": "file",
+                "branch": "without_files",
+                "size": sum(
+                    source is not None
+                    for source in {**current_files, **changes}.values()
+                ),
+            }
+            tracer.on_attempt(**trace, time=time.perf_counter())
+
+        with measure(stats, "checker"):
+            result = check(changes, current_file)
+
+        if result and stats is not None:
+            stats.entry("delete files", "file").accepted += 1
+        if tracer is not None:
+            if result:
+                tracer.on_accept(**trace, time=time.perf_counter())
+            else:
+                tracer.on_reject(**trace, time=time.perf_counter())
+        return result
+
+    def run_files(strategies, retries, token_pass):
         def tree_checker(new_source: str | None):
-            result = checker({**current_files, current_file: new_source}, current_file)
-            return result
+            return check({current_file: new_source}, current_file)
 
         for current_file in current_files.keys():
             file = current_files[current_file]
             if file is not None:
-                if tree_checker(None):
+                if check_deletion({current_file: None}, current_file):
                     current_files[current_file] = None
                     continue
                 current_files[current_file] = _minimize_source(
@@ -188,14 +713,236 @@ def minimize_all(
                     retries=retries,
                     compilable=compilable,
                     strategies=strategies,
+                    stats=stats,
+                    tracer=tracer,
+                    low_memory=low_memory,
+                    memory_limit=memory_limit,
+                    prepass=prepass,
+                    memo=memo,
+                    reduce_latency=reduce_latency,
+                    token_pass=token_pass,
                 )
 
-    for current_file in list(current_files.keys()):
-        new_files = {**current_files, current_file: None}
-        if checker(new_files, current_file):
-            current_files = new_files
+    def try_without_files(paths):
+        deleted_files = {path: None for path in paths}
+        if check_deletion(deleted_files, paths[0]):
+            current_files.update(deleted_files)
+            return True
+        return False
+
+    def without_files(paths):
+        if paths and not try_without_files(paths) and len(paths) > 1:
+            mid = len(paths) // 2
+            # remove in reverse order like minimize_list()
+            without_files(paths[mid:])
+            without_files(paths[:mid])
+
+    # delete large groups of unrelated files with a few checks
+    without_files(
+        [path for path, source in current_files.items() if source is not None]
+    )
 
-    run_files((default_strategies[0],), 0)
-    run_files(default_strategies, retries)
+    run_files((default_strategies[0],), 0, False)
+    run_files(default_strategies, retries, token_pass)
 
     return current_files
+
+
+def _minimize_group(sources, checker, *, collect_stats, **kwargs):
+    stats = Stats() if collect_stats else None
+    return minimize_all(sources, checker, stats=stats, **kwargs), stats
+
+
+def _minimize_groups(sources, checker, groups, *, jobs, stats, **kwargs):
+    groups = [list(group) for group in groups]
+
+    grouped_files = [path for group in groups for path in group]
+    if sorted(grouped_files) != sorted(sources) or len(set(grouped_files)) != len(
+        grouped_files
+    ):
+        raise ValueError("groups have to be a partition of the source files")
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                _minimize_group,
+                {path: sources[path] for path in group},
+                checker,
+                collect_stats=stats is not None,
+                **kwargs,
+            )
+            for group in groups
+            if group
+        ]
+        results = {}
+        for future in futures:
+            group_result, group_stats = future.result()
+            results.update(group_result)
+            if stats is not None:
+                stats.update(group_stats)
+
+    return {path: results[path] for path in sources}
+
+
+class _DeltaChecker:
+    """
+    calls the checker only with the files which changed since the last call
+    """
+
+    def __init__(self, checker):
+        self.checker = checker
+        self.seen: dict[Path, str | None] | None = None
+        # files where the checker has seen a different version than the current one
+        self.dirty: set[Path] = set()
+
+    def __call__(self, current_files, changes, current_file):
+        if self.seen is None:
+            self.seen = {**current_files, **changes}
+            diff = dict(self.seen)
+        else:
+            diff = {}
+            for path in self.dirty | changes.keys():
+                source = changes[path] if path in changes else current_files[path]
+                if self.seen[path] != source:
+                    diff[path] = self.seen[path] = source
+
+        self.dirty = {path for path in changes if changes[path] != current_files[path]}
+
+        return self.checker(diff, current_file)
+
+
+class _SharedChecker:
+    """
+    shares the verdicts of the candidates between the processes of `minimize_many()`
+    and aborts the minimization when the budget is used up
+    """
+
+    def __init__(self, checker, verdicts, cancelled, deadline):
+        self.checker = checker
+        self.verdicts = verdicts
+        self.cancelled = cancelled
+        self.deadline = deadline
+
+    def __call__(self, source, *args):
+        if self.cancelled.is_set():
+            # nobody waits for the result
+            raise AbortMinimization()
+
+        key = hashlib.sha256(source.encode()).hexdigest()
+        verdict = self.verdicts.get(key)
+        if verdict is not None:
+            return verdict
+
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise AbortMinimization()
+
+        result = bool(self.checker(source, *args))
+        self.verdicts[key] = result
+        return result
+
+
+def _minimize_item(source, checker, verdicts, cancelled, budget, kwargs):
+    deadline = None if budget is None else time.monotonic() + budget
+    try:
+        return minimize(
+            source, _SharedChecker(checker, verdicts, cancelled, deadline), **kwargs
+        )
+    except CouldNotMinimize as e:
+        return e
+    except AbortMinimization:
+        # the budget was used up before the original source was checked
+        return source
+
+
+def minimize_many(
+    sources: Iterable[str],
+    checker: Callable[[str], bool],
+    *,
+    jobs: int | None = None,
+    budget: float | None = None,
+    retries: int = 1,
+    compilable=True,
+    low_memory: bool = False,
+    memory_limit: int | None = None,
+    prepass: bool = False,
+    memo: bool = False,
+    reduce_latency: float | None = None,
+    token_pass: bool = False,
+    with_code: bool = False,
+) -> Iterator[tuple[int, str | CouldNotMinimize]]:
+    """
+    minimizes many independent sources in parallel.
+
+    Every source is minimized like `minimize()` and the results are yielded as soon as they are finished.
+    Identical sources are minimized only once, and the verdicts of the checker are shared between all sources,
+    which means that a candidate is only checked once even if it is created for different sources.
+    The running minimizations are stopped at their next check when the iteration is stopped early.
+
+    Example:
+        ``` python
+        for index, result in minimize_many(crashes, checker, jobs=8, budget=60):
+            Path(f"crash_{index}.py").write_text(result)
+        ```
+
+    Args:
+        sources: the source codes to minimize
+        checker: a function which gets the source and returns `True` when the criteria is fulfilled.
+            The checker has to be picklable and the same for all sources.
+        jobs: the number of processes which are used (defaults to the number of cpus).
+        budget: the time in seconds which can be used for every source.
+            The minimization stops when the budget is used up and the result is not minimal.
+        retries: the number of retries which should be performed when the ast could be minimized (useful for non deterministic issues)
+        compilable: make sure that the minimized code can also be compiled and not just parsed.
+        low_memory: use less memory for large sources (the locations of the ast nodes are not kept).
+        memory_limit: stop the minimization and return the current result when the process uses more memory (in bytes).
+        prepass: remove whole top-level statements and statements of class/function bodies with cheap checks
+            before the strategies are used (useful for large sources).
+        memo: remember which transformations failed and skip them in the following rounds
+            until the enclosing function/class/module of the transformed node changes.
+        reduce_latency: reduce loop bounds, repetition counts and large literals first,
+            while the checks take longer than this number of seconds (e.g. `0.01`).
+            This makes the following checks and the final reproducer faster.
+        token_pass: remove redundant parentheses and attribute names and shorten identifiers and literals
+            of the result on the token level. The candidates are validated with `compile()`.
+        with_code: the checker gets the code object of the candidate as second argument (`checker(source, code)`).
+
+    Yields:
+        `(index, result)` tuples, where `index` is the position of the source in `sources`.
+        The result is a `CouldNotMinimize` exception if the checker returned `False` for the source.
+    """
+    kwargs = dict(
+        retries=retries,
+        compilable=compilable,
+        low_memory=low_memory,
+        memory_limit=memory_limit,
+        prepass=prepass,
+        memo=memo,
+        reduce_latency=reduce_latency,
+        token_pass=token_pass,
+        with_code=with_code,
+    )
+
+    indices: dict[str, list[int]] = {}
+    for index, source in enumerate(sources):
+        indices.setdefault(source, []).append(index)
+
+    with multiprocessing.Manager() as manager:
+        verdicts = manager.dict()
+        cancelled = manager.Event()
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            futures = {
+                executor.submit(
+                    _minimize_item, source, checker, verdicts, cancelled, budget, kwargs
+                ): source
+                for source in indices
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                for index in indices[futures[future]]:
+                    yield index, result
+        finally:
+            # the running minimizations stop at their next check
+            # when the generator is closed before all results are finished
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
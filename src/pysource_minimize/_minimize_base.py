@@ -1,9 +1,17 @@
 import ast
 import copy
+import gc
+import hashlib
 import sys
+import time
+import warnings
 from typing import List
 from typing import Union
 
+from ._stats import measure
+from ._trace import current_branch
+from ._utils import memory_usage
+
 TESTING = False
 
 
@@ -27,10 +35,26 @@ else:
     ast_const_types = (ast.Constant,)
 
 
+# the fingerprint of the enclosing scope is part of the key of the negative memo
+scope_types = (
+    ast.Module,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.Lambda,
+)
+
+
 class StopMinimization(Exception):
     pass
 
 
+class AbortMinimization(Exception):
+    """
+    stops the minimization without accepting the current candidate
+    """
+
+
 class CoverageRequired(Exception):
     pass
 
@@ -86,10 +110,27 @@ def arguments(
 class MinimizeBase:
     allow_multiple_mappings = False
 
-    def __init__(self, original_ast, checker, progress_callback):
+    def __init__(
+        self,
+        original_ast,
+        checker,
+        progress_callback,
+        *,
+        stats=None,
+        tracer=None,
+        low_memory=False,
+        memory_limit=None,
+        memo=None,
+    ):
         self.checker = checker
         self.progress_callback = progress_callback
+        self.stats = stats
+        self.tracer = tracer
+        self.memory_limit = memory_limit
+        self.memo = memo
+        self.scope_cache = None
         self.stop = False
+        self.aborted = False
 
         # duplicate nodes like ast.Load()
         class UniqueObj(ast.NodeTransformer):
@@ -100,6 +141,13 @@ class MinimizeBase:
 
         self.original_ast = UniqueObj().visit(copy.deepcopy(original_ast))
 
+        if low_memory:
+            # unparse() uses only the lineno (for `# type: ignore` comments)
+            for node in ast.walk(self.original_ast):
+                for attr in node._attributes:
+                    if attr != "lineno" and attr in node.__dict__:
+                        delattr(node, attr)
+
         self.original_nodes_number = self.nodes_of(self.original_ast)
 
         def wrap(value):
@@ -124,24 +172,64 @@ class MinimizeBase:
                 ]:
                     setattr(node, name, wrap(value))
 
+        self.node_types = []
         for i, node in enumerate(ast.walk(self.original_ast)):
             node.__index = i
+            if stats is not None or tracer is not None:
+                self.node_types.append(type(node).__name__)
 
         self.replaced = {}
 
         self.start(self.original_ast)
 
+        if stats is not None:
+            stats.attempt(type(self).__name__, type(self.original_ast).__name__)
+
         try:
+            self.check_memory()
             if not self.checker(self.get_ast(self.original_ast)):
                 raise ValueError("checker return False: nothing to minimize here")
 
             self.minimize_stmt(self.original_ast)
         except StopMinimization:
             self.stop = True
+        except AbortMinimization:
+            self.stop = True
+            self.aborted = True
 
     def start(self, ast: ast.AST):
         pass
 
+    def check_memory(self):
+        """
+        records the peak memory usage and aborts the minimization
+        if the memory limit is reached.
+        """
+        if self.memory_limit is None and self.stats is None:
+            return
+
+        usage = memory_usage()
+        if usage is None:
+            return
+
+        if self.memory_limit is not None and usage > self.memory_limit:
+            gc.collect()
+            usage = memory_usage()
+            if usage > self.memory_limit:
+                warnings.warn(
+                    f"the memory limit of {self.memory_limit} bytes was reached ({usage} bytes are used),"
+                    " the result is not minimal"
+                )
+                raise AbortMinimization()
+
+        if self.stats is not None:
+            self.stats.peak_memory = max(self.stats.peak_memory, usage)
+
+    def node_type_of(self, replaced):
+        for key in replaced:
+            return self.node_types[key[0] if isinstance(key, tuple) else key]
+        return ""
+
     def index_of(self, node):
         return node.__index
 
@@ -261,6 +349,19 @@ class MinimizeBase:
     def get_current_node(self, ast_node):
         return self.get_ast(ast_node)
 
+    def live_indices(self):
+        """
+        the indices of all original nodes which are still part of the current tree
+        """
+        return {
+            n.__index
+            for n in ast.walk(self.get_ast(self.original_ast))
+            if hasattr(n, "_MinimizeBase__index")
+        }
+
+    def is_replaced(self, node):
+        return node.__index in self.replaced
+
     def get_current_tree(self, replaced):
         tree = self.get_ast(self.original_ast, replaced)
         ast.fix_missing_locations(tree)
@@ -287,6 +388,106 @@ class MinimizeBase:
     def nodes_of(tree):
         return len(list(ast.walk(tree)))
 
+    def current_scopes(self):
+        """
+        returns the nodes of the current tree by index, the parents of the nodes
+        and a cache for the fingerprints of the scopes.
+
+        The result is cached until the next minimization is accepted.
+        """
+        if self.scope_cache is None:
+            tree = self.get_ast(self.original_ast)
+            nodes = {}
+            parents = {}
+            for node in ast.walk(tree):
+                if hasattr(node, "_MinimizeBase__index"):
+                    nodes.setdefault(node.__index, node)
+                for child in ast.iter_child_nodes(node):
+                    parents[child] = node
+            self.scope_cache = (nodes, parents, {})
+        return self.scope_cache
+
+    def memo_key(self, replaced):
+        """
+        returns a key for the transformation which is independent of the indices of this minimizer
+        and changes when the enclosing scope of the transformed nodes changes.
+
+        returns None if the transformation can not be memorized.
+        """
+        nodes, parents, fingerprints = self.current_scopes()
+
+        def path_in_scope(node):
+            # the enclosing scope of a function is the scope where it is defined
+            path = []
+            while node in parents:
+                parent = parents[node]
+                for name, value in ast.iter_fields(parent):
+                    if value is node:
+                        path.append((name,))
+                        break
+                    if isinstance(value, list):
+                        positions = [i for i, e in enumerate(value) if e is node]
+                        if positions:
+                            path.append((name, positions[0]))
+                            break
+                node = parent
+                if isinstance(node, scope_types):
+                    break
+            return node, tuple(reversed(path))
+
+        scope = None
+
+        def path_of(index):
+            nonlocal scope
+            if index not in nodes:
+                return None
+            node_scope, path = path_in_scope(nodes[index])
+            if scope is not None and node_scope is not scope:
+                return None
+            scope = node_scope
+            return path
+
+        def reference(value):
+            # plain keys map nodes to other nodes (indices) or to new values
+            if isinstance(value, int) and not isinstance(value, bool):
+                path = path_of(value)
+                if path is None:
+                    raise KeyError(value)
+                return ("node", path)
+            if isinstance(value, list):
+                return tuple(reference(e) for e in value)
+            return literal(value)
+
+        def literal(value):
+            # the values of attributes are stored as they are, ints are no indices here
+            if isinstance(value, list):
+                return tuple(literal(e) for e in value)
+            if isinstance(value, ValueWrapper):
+                return ("value", repr(value.value))
+            if isinstance(value, ast.AST):
+                return ("new", ast.dump(value))
+            return ("value", repr(value))
+
+        transformation = []
+        try:
+            for key, value in replaced.items():
+                if isinstance(key, tuple):
+                    transformation.append(((reference(key[0]), key[1]), literal(value)))
+                else:
+                    transformation.append((reference(key), reference(value)))
+        except KeyError:
+            return None
+
+        if scope is None:
+            return None
+
+        if id(scope) not in fingerprints:
+            fingerprints[id(scope)] = hashlib.blake2b(
+                ast.dump(scope).encode(), digest_size=16
+            ).digest()
+
+        return (type(self).__name__, fingerprints[id(scope)], tuple(transformation))
+
     def try_with(self, replaced={}):
         """
         returns True if the minimization was successful
@@ -298,27 +499,63 @@ class MinimizeBase:
                 not double_defined
             ), f"the keys {double_defined} are mapped a second time"
 
-        tree = self.get_current_tree(replaced)
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Delete) and any(
-                isinstance(target, ast_const_types) for target in node.targets
-            ):
-                # code like:
-                # delete None
+        memo_key = None
+        if self.memo is not None:
+            memo_key = self.memo_key(replaced)
+            if memo_key in self.memo:
+                if self.stats is not None:
+                    self.stats.entry(
+                        type(self).__name__, self.node_type_of(replaced)
+                    ).skipped += 1
                 return False
 
+        if self.stats is not None:
+            self.stats.attempt(type(self).__name__, self.node_type_of(replaced))
+
+        with measure(self.stats, "get_ast"):
+            tree = self.get_current_tree(replaced)
+
+            # code like:
+            # delete None
+            deletes_constant = any(
+                isinstance(node, ast.Delete)
+                and any(isinstance(target, ast_const_types) for target in node.targets)
+                for node in ast.walk(tree)
+            )
+
+        # the memory usage is the highest when the candidate is alive
+        self.check_memory()
+
+        if self.tracer is not None:
+            trace = {
+                "strategy": type(self).__name__,
+                "node_type": self.node_type_of(replaced),
+                "branch": current_branch(),
+                "size": self.nodes_of(tree),
+            }
+            self.tracer.on_attempt(**trace, time=time.perf_counter())
+
         valid_minimization = False
 
         try:
-            valid_minimization = self.checker(tree)
+            valid_minimization = not deletes_constant and self.checker(tree)
         except StopMinimization:
             valid_minimization = True
             raise
         finally:
             if valid_minimization:
                 self.replaced.update(replaced)
+                self.scope_cache = None
+                if self.stats is not None:
+                    self.stats.current.accepted += 1
+                if self.tracer is not None:
+                    self.tracer.on_accept(**trace, time=time.perf_counter())
                 self.progress_callback(self.nodes_of(tree), self.original_nodes_number)
+            elif self.tracer is not None:
+                self.tracer.on_reject(**trace, time=time.perf_counter())
+
+        if not valid_minimization and memo_key is not None:
+            self.memo.add(memo_key)
 
         return valid_minimization
 
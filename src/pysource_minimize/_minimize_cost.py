@@ -0,0 +1,162 @@
+import ast
+import time
+
+from ._minimize_base import MinimizeBase
+
+
+def smaller_values(value):
+    """
+    0, 1, 10, 100, ... up to (but without) the value
+    """
+    candidate = 0
+    while candidate < value:
+        yield candidate
+        candidate = 1 if candidate == 0 else candidate * 10
+
+
+class MinimizeCost(MinimizeBase):
+    """
+    reduces the values which make the checks slow before the other strategies are used:
+    loop bounds and repetition counts (`range(10**7)`, `"a" * 10000`),
+    large literals and long list/tuple/set displays.
+
+    Every value is tried with a few orders of magnitude (smallest first), because every check can take a long time.
+    The latency of the checker is measured for every candidate.
+    The reductions of the kinds of values (ints, strings, powers, displays) which lowered the latency most
+    are preferred, every kind is tried once first and the static cost decides between values of the same kind.
+    The strategy stops when the checks are faster than `min_latency` (in seconds).
+    """
+
+    allow_multiple_mappings = True
+
+    large_number = 100
+    large_size = 100
+
+    def __init__(self, *args, min_latency: float = 0.01, **kwargs):
+        self.min_latency = min_latency
+        super().__init__(*args, **kwargs)
+
+    def start(self, tree):
+        checker = self.checker
+        self.latency = 0.0
+
+        # the lowered latency and the reduced static cost of every kind of value
+        self.gains: dict[str, tuple[float, int]] = {}
+
+        def timed_checker(tree):
+            start = time.perf_counter()
+            try:
+                return checker(tree)
+            finally:
+                self.latency = time.perf_counter() - start
+
+        self.checker = timed_checker
+
+    def cost(self, node: ast.AST) -> int:
+        """
+        the estimated runtime cost of the node, 0 if the node is cheap
+        """
+        if isinstance(node, ast.Constant):
+            value = node.value
+            if type(value) is int and abs(value) >= self.large_number:
+                return abs(value)
+            if isinstance(value, (str, bytes)) and len(value) >= self.large_size:
+                return len(value)
+        elif (
+            isinstance(node, ast.BinOp)
+            and isinstance(node.op, ast.Pow)
+            and isinstance(node.left, ast.Constant)
+            and isinstance(node.right, ast.Constant)
+        ):
+            # 10**7
+            base, exponent = node.left.value, node.right.value
+            if type(base) is int and type(exponent) is int and exponent >= 0:
+                value = abs(base) ** min(exponent, 64)
+                if value >= self.large_number:
+                    return value
+        elif isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            if len(node.elts) >= self.large_size:
+                return len(node.elts)
+        return 0
+
+    def kind(self, node: ast.AST) -> str:
+        if isinstance(node, ast.Constant):
+            return type(node.value).__name__
+        return type(node).__name__
+
+    def priority(self, node: ast.AST):
+        """
+        the expected lowered latency of the reduction, kinds which were not reduced before come first
+        """
+        cost = self.cost(node)
+        gain = self.gains.get(self.kind(node))
+        if gain is None:
+            return (1, 0.0, cost)
+        latency, reduced_cost = gain
+        return (0, latency / reduced_cost * cost, cost)
+
+    def minimize_stmt(self, tree):
+        # the latency of the current tree (measured by the first check)
+        current_latency = self.latency
+        if current_latency < self.min_latency:
+            return
+
+        pending = [node for node in ast.walk(tree) if self.cost(node)]
+
+        live = None
+        while pending:
+            if live is None:
+                live = self.live_indices()
+            pending = [node for node in pending if self.index_of(node) in live]
+            if not pending:
+                return
+
+            node = max(pending, key=self.priority)
+            pending.remove(node)
+
+            cost = self.cost(node)
+            if self.reduce(node):
+                live = None
+
+                # the latency of the accepted candidate
+                kind = self.kind(node)
+                latency, reduced_cost = self.gains.get(kind, (0.0, 0))
+                self.gains[kind] = (
+                    latency + max(current_latency - self.latency, 0.0),
+                    reduced_cost + cost,
+                )
+                current_latency = self.latency
+
+                if current_latency < self.min_latency:
+                    # the other strategies can do the rest
+                    return
+
+    def reduce(self, node) -> bool:
+        """
+        tries the smallest values first and returns True if the node was reduced
+        """
+        if isinstance(node, ast.Constant):
+            value = node.value
+            if isinstance(value, int):
+                sign = -1 if value < 0 else 1
+                return any(
+                    self.try_attr(node, "value", sign * smaller)
+                    for smaller in smaller_values(abs(value))
+                )
+
+            assert isinstance(value, (str, bytes))
+            return any(
+                self.try_attr(node, "value", value[:length])
+                for length in smaller_values(len(value))
+            )
+
+        if isinstance(node, ast.BinOp):
+            return any(
+                self.try_node(node, ast.Constant(value=value))
+                for value in smaller_values(self.cost(node))
+            )
+
+        return any(
+            self.try_without(node.elts[length:])
+            for length in smaller_values(len(node.elts))
+        )
@@ -1,8 +1,11 @@
 import ast
 import sys
 
+from ._def_use import defined_names
+from ._def_use import DefUseIndex
 from ._minimize_base import arguments
 from ._minimize_base import coverage_required
+from ._minimize_base import is_block
 from ._minimize_base import MinimizeBase
 from ._minimize_base import ValueWrapper
 
@@ -19,6 +22,31 @@ def walk_until(node, stop=()):
 
 
 class MinimizeStructure(MinimizeBase):
+    # remove definitions together with the statements which use them
+    couple_dependent_removals = True
+
+    def start(self, tree: ast.AST):
+        self.def_use = DefUseIndex(tree) if self.couple_dependent_removals else None
+
+    def try_without_dependents(self, node) -> bool:
+        """
+        tries to remove a definition together with all statements which use the defined names.
+
+        returns False if the removal failed or if there are no such statements.
+        """
+        if self.def_use is None or not isinstance(node, ast.stmt):
+            return False
+
+        if not any(name in self.def_use.uses for name in defined_names(node)):
+            return False
+
+        live = self.live_indices()
+        uses = self.def_use.dangling_uses(node, lambda n: self.index_of(n) in live)
+        if not uses:
+            return False
+
+        return self.try_without([node, *uses])
+
     def minimize(self, o):
         if isinstance(o, (ast.expr, ast.stmt)) and hasattr(o, "type_comment"):
             self.try_attr(o, "type_comment", None)
@@ -759,12 +787,25 @@ class MinimizeStructure(MinimizeBase):
         # result= self.minimize_lists((stmts,),(terminal,),minimal=0)
         # return [e[0] for e in result]
 
-        stmts = list(stmts)
+        block = bool(is_block(list(stmts)))
+
+        def removed(node):
+            return block and self.replaced.get(self.index_of(node)) == []
+
+        def not_replaced(l):
+            # statements can already be removed together with a definition
+            return [n for n in l if not removed(n)]
+
+        stmts = not_replaced(stmts)
         max_remove = len(stmts) - minimal
 
         def wo(l):
             nonlocal max_remove
 
+            l = not_replaced(l)
+            if not l:
+                return
+
             if max_remove < len(l) or not self.try_without(l):
                 divide(l)
             else:
@@ -772,11 +813,14 @@ class MinimizeStructure(MinimizeBase):
 
         def divide(l):
             nonlocal max_remove, remaining
+            l = not_replaced(l)
             if not l:
                 return
 
             if len(l) == 1:
-                if max_remove >= 1 and self.try_without(l):
+                if max_remove >= 1 and (
+                    self.try_without_dependents(l[0]) or self.try_without(l)
+                ):
                     max_remove -= 1
                 else:
                     remaining.append(l[0])
@@ -792,6 +836,7 @@ class MinimizeStructure(MinimizeBase):
         divide(stmts)
 
         for node in remaining:
-            terminal(node)
+            if not removed(node):
+                terminal(node)
 
-        return remaining
+        return not_replaced(remaining)
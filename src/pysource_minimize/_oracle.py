@@ -0,0 +1,105 @@
+import codecs
+import os
+import re
+import signal
+import subprocess as sp
+from typing import List
+from typing import Optional
+
+
+class Oracle:
+    """
+    decides if the output of a command still shows the problem.
+
+    The output is read while the command is running and the command is terminated
+    as soon as the result is known.
+    """
+
+    def __init__(
+        self,
+        track: Optional[str],
+        *,
+        regex: bool = False,
+        returncode: Optional[int] = None,
+    ):
+        self.track = track
+        self.pattern = re.compile(track) if regex and track is not None else None
+        self.returncode = returncode
+
+    def output_matches(self, output: str, start: int = 0) -> bool:
+        """
+        returns True if the track can be found in the output.
+        `start` can be used to search only in the part of the output which is new.
+        """
+        if self.track is None:
+            return True
+        if self.pattern is not None:
+            return self.pattern.search(output) is not None
+        return self.track in output[max(start - len(self.track) + 1, 0) :]
+
+    def returncode_matches(self, returncode: int) -> bool:
+        return self.returncode is None or self.returncode == returncode
+
+    def matches(self, result: sp.CompletedProcess) -> bool:
+        output = result.stdout.decode(errors="replace") + result.stderr.decode(
+            errors="replace"
+        )
+        return self.output_matches(output) and self.returncode_matches(
+            result.returncode
+        )
+
+    def run(self, cmd: List[str], cwd=None) -> bool:
+        """
+        runs the command and returns True if the problem can still be reproduced
+        """
+        process = sp.Popen(
+            cmd,
+            stdout=sp.PIPE,
+            stderr=sp.STDOUT,
+            cwd=cwd,
+            start_new_session=os.name == "posix",
+        )
+        assert process.stdout is not None
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        output = ""
+        found = False
+        finished = False
+
+        try:
+            while True:
+                data = os.read(process.stdout.fileno(), 65536)
+                if not data:
+                    break
+
+                start = len(output)
+                output += decoder.decode(data)
+
+                if not found and self.output_matches(output, start):
+                    found = True
+                    if self.returncode is None:
+                        # there is nothing else we have to wait for
+                        return True
+
+            output += decoder.decode(b"", final=True)
+            process.wait()
+            finished = True
+        finally:
+            process.stdout.close()
+            if not finished:
+                _kill(process)
+                process.wait()
+
+        return (found or self.output_matches(output)) and self.returncode_matches(
+            process.returncode
+        )
+
+
+def _kill(process: sp.Popen):
+    if os.name == "posix":
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:  # pragma: no cover
+            pass
+    else:  # pragma: no cover
+        process.kill()
@@ -0,0 +1,113 @@
+import ast
+import copy
+import time
+
+from ._minimize_base import AbortMinimization
+from ._minimize_base import MinimizeBase
+from ._minimize_base import StopMinimization
+from ._stats import measure
+
+body_owners = (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+class CoarsePrepass:
+    """
+    removes whole top-level statements and statements of class/function bodies.
+
+    The candidates are created by assigning new lists to the bodies of the tree
+    and not by copying the whole tree, which makes every check cheap.
+    The result is minimized further by the normal strategies.
+    """
+
+    def __init__(
+        self, original_ast, checker, *, stats=None, tracer=None, copy_candidates=False
+    ):
+        self.tree = copy.deepcopy(original_ast)
+        self.checker = checker
+        # the checker gets the working tree, unless it could modify the candidate
+        self.copy_candidates = copy_candidates
+        self.stats = stats
+        self.tracer = tracer
+        self.stop = False
+        self.aborted = False
+
+        try:
+            self.minimize_body(self.tree)
+        except StopMinimization:
+            self.stop = True
+        except AbortMinimization:
+            self.stop = True
+            self.aborted = True
+
+    def check(self, node_type):
+        if self.stats is not None:
+            self.stats.attempt(type(self).__name__, node_type)
+
+        if self.tracer is not None:
+            trace = {
+                "strategy": type(self).__name__,
+                "node_type": node_type,
+                "branch": "minimize_body",
+                "size": MinimizeBase.nodes_of(self.tree),
+            }
+            self.tracer.on_attempt(**trace, time=time.perf_counter())
+
+        result = False
+        try:
+            if self.copy_candidates:
+                result = self.checker(copy.deepcopy(self.tree))
+            else:
+                result = self.checker(self.tree)
+        except StopMinimization:
+            result = True
+            raise
+        finally:
+            if result and self.stats is not None:
+                self.stats.current.accepted += 1
+            if self.tracer is not None:
+                if result:
+                    self.tracer.on_accept(**trace, time=time.perf_counter())
+                else:
+                    self.tracer.on_reject(**trace, time=time.perf_counter())
+
+        return result
+
+    def minimize_body(self, owner):
+        keep = list(owner.body)
+
+        def set_body(body):
+            if not body and not isinstance(owner, ast.Module):
+                body = [ast.copy_location(ast.Pass(), owner)]
+            owner.body = body
+
+        def try_without(chunk):
+            nonlocal keep
+            removed = {id(stmt) for stmt in chunk}
+            candidate = [stmt for stmt in keep if id(stmt) not in removed]
+
+            with measure(self.stats, "get_ast"):
+                set_body(candidate)
+            try:
+                if self.check(type(chunk[0]).__name__):
+                    keep = candidate
+                    return True
+            except StopMinimization:
+                keep = candidate
+                raise
+            finally:
+                set_body(keep)
+            return False
+
+        def divide(chunk):
+            if not chunk or try_without(chunk) or len(chunk) == 1:
+                return
+            mid = len(chunk) // 2
+            # remove in reverse order like minimize_list()
+            divide(chunk[mid:])
+            divide(chunk[:mid])
+
+        divide(keep)
+
+        for stmt in keep:
+            if isinstance(stmt, body_owners):
+                self.minimize_body(stmt)
@@ -0,0 +1,426 @@
+"""
+a long running minimization service which shares a pool of worker processes between many jobs.
+
+The service, the workers and the clients communicate with `multiprocessing.connection`
+over a unix socket (the address is a path) or tcp (the address is a `(host, port)` tuple).
+The workers do not need access to the files of the service or of the clients.
+They get the sources of every candidate and import the checker (`"module:function"`) on their own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import itertools
+import json
+import threading
+import traceback
+from collections import deque
+from multiprocessing.connection import Client
+from multiprocessing.connection import Connection
+from multiprocessing.connection import Listener
+from pathlib import Path
+from typing import Any
+
+from ._minimize import CouldNotMinimize
+from ._minimize import minimize_all
+from ._minimize_base import StopMinimization
+
+# the options of `minimize_all()` which can be used by a job
+job_options = ("retries", "compilable", "prepass", "memo", "token_pass")
+
+
+class ServiceError(RuntimeError):
+    """Raised by `MinimizeClient` when the job failed in the service or in a worker."""
+
+
+def import_checker(name: str):
+    """
+    imports the checker `"module:function"`
+    """
+    module_name, _, function_name = name.partition(":")
+    if not function_name:
+        raise ValueError(
+            f"the checker '{name}' has to be of the form 'module:function'"
+        )
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+class _Evaluation:
+    def __init__(self, key, request):
+        self.key = key
+        self.request = request
+        self.done = threading.Event()
+        self.result = False
+        self.stop = False
+        self.error: str | None = None
+
+
+class _Job:
+    def __init__(self, job_id, checker):
+        self.id = job_id
+        self.checker = checker
+        self.pending: deque[_Evaluation] = deque()
+
+
+class MinimizeService:
+    """
+    minimizes the sources of many jobs with `minimize_all()` and evaluates the candidates in the registered workers.
+
+    The jobs are scheduled round-robin, every job with a pending candidate gets the next free worker in turn.
+    The verdicts are cached across jobs (the key is the checker and the files of the candidate),
+    and a candidate which is evaluated at the moment is not sent to a second worker.
+
+    Example:
+        ``` python
+        with MinimizeService("/tmp/minimize.sock", authkey=b"secret") as service:
+            service.serve_forever()
+        ```
+
+    Args:
+        address: a path for a unix socket or a `(host, port)` tuple for tcp.
+        authkey: the key which is used to authenticate the workers and clients.
+        cache_size: the maximal number of cached verdicts.
+    """
+
+    def __init__(self, address, *, authkey: bytes, cache_size: int = 100_000):
+        self.listener = Listener(address, authkey=authkey)
+        self.cache_size = cache_size
+
+        self.condition = threading.Condition()
+        self.verdicts: dict[bytes, bool] = {}
+        self.running: dict[bytes, _Evaluation] = {}
+        self.jobs: deque[_Job] = deque()
+        self.job_ids = itertools.count()
+        self.workers = 0
+        # the number of candidates which were evaluated by the workers
+        self.evaluations = 0
+        self.closed = False
+
+        self.thread: threading.Thread | None = None
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def start(self):
+        """
+        accepts workers and clients in a background thread
+        """
+        self.thread = threading.Thread(target=self.accept_connections, daemon=True)
+        self.thread.start()
+
+    def serve_forever(self):
+        if self.thread is None:
+            self.start()
+        assert self.thread is not None
+        self.thread.join()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.listener.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def accept_connections(self):
+        while not self.closed:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                if self.closed:
+                    return
+                # the client reset the connection during the authentication
+                continue
+            except Exception:
+                # failed authentication
+                continue
+
+            threading.Thread(
+                target=self.handle_connection, args=(connection,), daemon=True
+            ).start()
+
+    def handle_connection(self, connection: Connection):
+        try:
+            message = connection.recv()
+            if message["type"] == "worker":
+                self.serve_worker(connection)
+            elif message["type"] == "job":
+                self.run_job(connection, message)
+        except (EOFError, OSError):
+            pass
+        finally:
+            connection.close()
+
+    def serve_worker(self, connection: Connection):
+        with self.condition:
+            self.workers += 1
+        try:
+            while True:
+                evaluation = self.next_evaluation()
+                if evaluation is None:
+                    return
+                try:
+                    connection.send(evaluation.request)
+                    verdict = connection.recv()
+                except (EOFError, OSError):
+                    # the worker is gone, another worker has to evaluate the candidate
+                    self.reschedule(evaluation)
+                    raise
+                self.finish(evaluation, verdict)
+        finally:
+            with self.condition:
+                self.workers -= 1
+
+    def next_evaluation(self) -> _Evaluation | None:
+        """
+        returns the next candidate of the next job which is waiting for a worker
+        """
+        with self.condition:
+            while not self.closed:
+                for _ in range(len(self.jobs)):
+                    job = self.jobs[0]
+                    self.jobs.rotate(-1)
+                    if job.pending:
+                        return job.pending.popleft()
+                self.condition.wait()
+            return None
+
+    def reschedule(self, evaluation: _Evaluation):
+        with self.condition:
+            for job in self.jobs:
+                if job.id == evaluation.request["job"]:
+                    job.pending.appendleft(evaluation)
+                    self.condition.notify_all()
+                    return
+            # the job was finished in the meantime
+            evaluation.error = "the job was removed"
+            del self.running[evaluation.key]
+        evaluation.done.set()
+
+    def finish(self, evaluation: _Evaluation, verdict: dict[str, Any]):
+        with self.condition:
+            self.evaluations += 1
+            evaluation.result = verdict.get("result", False)
+            evaluation.stop = verdict.get("stop", False)
+            evaluation.error = verdict.get("error")
+            if evaluation.error is None and not evaluation.stop:
+                if len(self.verdicts) >= self.cache_size:
+                    self.verdicts.pop(next(iter(self.verdicts)))
+                self.verdicts[evaluation.key] = evaluation.result
+            del self.running[evaluation.key]
+        evaluation.done.set()
+
+    def evaluate(self, job: _Job, files: dict[Path, str | None], current_file: Path):
+        """
+        the checker for `minimize_all()`, which waits until a worker evaluated the candidate
+        """
+        wire_files = {str(path): source for path, source in files.items()}
+        key = hashlib.sha256(
+            json.dumps(
+                [job.checker, sorted(wire_files.items()), str(current_file)]
+            ).encode()
+        ).digest()
+
+        with self.condition:
+            if self.closed:
+                raise ServiceError("the service was closed")
+            if key in self.verdicts:
+                return self.verdicts[key]
+
+            evaluation = self.running.get(key)
+            if evaluation is None:
+                evaluation = _Evaluation(
+                    key,
+                    {
+                        "type": "check",
+                        "job": job.id,
+                        "checker": job.checker,
+                        "files": wire_files,
+                        "current_file": str(current_file),
+                    },
+                )
+                self.running[key] = evaluation
+                job.pending.append(evaluation)
+                self.condition.notify_all()
+
+        while not evaluation.done.wait(1):
+            if self.closed:
+                raise ServiceError("the service was closed")
+
+        if evaluation.error is not None:
+            raise ServiceError(f"the checker failed in the worker:\n{evaluation.error}")
+        if evaluation.stop:
+            raise StopMinimization()
+        return evaluation.result
+
+    def run_job(self, connection: Connection, message: dict[str, Any]):
+        options = message.get("options", {})
+        unknown = set(options) - set(job_options)
+
+        job = _Job(next(self.job_ids), message["checker"])
+        with self.condition:
+            self.jobs.append(job)
+
+        try:
+            if unknown:
+                raise ServiceError(f"unknown options: {', '.join(sorted(unknown))}")
+
+            result = minimize_all(
+                {Path(path): source for path, source in message["sources"].items()},
+                lambda files, current_file: self.evaluate(job, files, current_file),
+                **options,
+            )
+        except CouldNotMinimize as e:
+            connection.send(
+                {"type": "error", "kind": "CouldNotMinimize", "message": str(e)}
+            )
+        except Exception as e:
+            connection.send(
+                {"type": "error", "kind": type(e).__name__, "message": str(e)}
+            )
+        else:
+            connection.send(
+                {
+                    "type": "result",
+                    "sources": {str(path): source for path, source in result.items()},
+                }
+            )
+        finally:
+            with self.condition:
+                self.jobs.remove(job)
+
+
+class MinimizeWorker:
+    """
+    evaluates the candidates of a `MinimizeService`.
+
+    The worker imports the checkers of the jobs and calls them like `minimize_all()` does.
+
+    Args:
+        address: the address of the service.
+        authkey: the key of the service.
+    """
+
+    def __init__(self, address, *, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self.checkers: dict[str, Any] = {}
+
+    def check(self, request: dict[str, Any]) -> dict[str, Any]:
+        try:
+            if request["checker"] not in self.checkers:
+                self.checkers[request["checker"]] = import_checker(request["checker"])
+            checker = self.checkers[request["checker"]]
+
+            files = {Path(path): source for path, source in request["files"].items()}
+            return {"result": bool(checker(files, Path(request["current_file"])))}
+        except StopMinimization:
+            return {"result": True, "stop": True}
+        except Exception:
+            return {"error": traceback.format_exc()}
+
+    def run(self):
+        """
+        evaluates candidates until the service is closed
+        """
+        with Client(self.address, authkey=self.authkey) as connection:
+            connection.send({"type": "worker"})
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+                connection.send(self.check(request))
+
+
+class MinimizeClient:
+    """
+    submits jobs to a `MinimizeService`.
+
+    Example:
+        ``` python
+        client = MinimizeClient(("localhost", 6000), authkey=b"secret")
+        result = client.minimize({Path("bug.py"): source}, "my_checkers:check_crash")
+        ```
+
+    Args:
+        address: the address of the service.
+        authkey: the key of the service.
+    """
+
+    def __init__(self, address, *, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+
+    def minimize(
+        self, sources: dict[Path, str], checker: str, **options
+    ) -> dict[Path, str | None]:
+        """
+        minimizes the sources like `minimize_all()` and waits for the result.
+
+        Args:
+            sources: the source code to minimize
+            checker: the name of the checker (`"module:function"`) which is imported by the workers.
+                It is called like the checker of `minimize_all()`.
+            options: the options `retries`, `compilable`, `prepass`, `memo` and `token_pass` of `minimize_all()`.
+        """
+        with Client(self.address, authkey=self.authkey) as connection:
+            connection.send(
+                {
+                    "type": "job",
+                    "checker": checker,
+                    "sources": {str(path): source for path, source in sources.items()},
+                    "options": options,
+                }
+            )
+            message = connection.recv()
+
+        if message["type"] == "error":
+            if message["kind"] == "CouldNotMinimize":
+                raise CouldNotMinimize(message["message"])
+            raise ServiceError(f"{message['kind']}: {message['message']}")
+
+        return {Path(path): source for path, source in message["sources"].items()}
+
+
+def parse_address(address: str):
+    """
+    `host:port` is a tcp address, everything else is the path of a unix socket
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host, int(port))
+    return address
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pysource_minimize._service",
+        description="runs a minimization service or a worker",
+    )
+    parser.add_argument("role", choices=["serve", "worker"])
+    parser.add_argument(
+        "address", help="host:port for tcp or the path of a unix socket"
+    )
+    parser.add_argument("--authkey", required=True)
+    args = parser.parse_args(argv)
+
+    address = parse_address(args.address)
+    authkey = args.authkey.encode()
+
+    if args.role == "serve":
+        with MinimizeService(address, authkey=authkey) as service:
+            service.serve_forever()
+    else:
+        MinimizeWorker(address, authkey=authkey).run()
+
+
+if __name__ == "__main__":
+    main()
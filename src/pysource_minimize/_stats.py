@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextlib import nullcontext
+
+
+class StatsEntry:
+    """
+    the statistics for one node type of one strategy.
+
+    The times are in seconds.
+    `skipped` counts the attempts which were not checked because they failed before (see `memo`).
+    """
+
+    kinds = ("get_ast", "unparse", "compile", "checker")
+
+    def __init__(self):
+        self.attempts = 0
+        self.accepted = 0
+        self.skipped = 0
+        self.get_ast = 0.0
+        self.unparse = 0.0
+        self.compile = 0.0
+        self.checker = 0.0
+
+    @property
+    def time(self) -> float:
+        return sum(getattr(self, kind) for kind in self.kinds)
+
+    def update(self, other: StatsEntry):
+        self.attempts += other.attempts
+        self.accepted += other.accepted
+        self.skipped += other.skipped
+        for kind in self.kinds:
+            setattr(self, kind, getattr(self, kind) + getattr(other, kind))
+
+    def __repr__(self):
+        values = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in ("attempts", "accepted", "skipped", *self.kinds)
+        )
+        return f"StatsEntry({values})"
+
+
+class Stats:
+    """
+    collects statistics about the minimization.
+
+    Example:
+        ``` python
+        stats = Stats()
+        minimize(source, checker, stats=stats)
+        print(stats)
+        ```
+
+    `stats.entries` maps `(strategy, node_type)` to a `StatsEntry`
+    and `stats.peak_memory` is the highest observed memory usage in bytes.
+    """
+
+    def __init__(self):
+        self.entries: dict[tuple[str, str], StatsEntry] = {}
+        self.current: StatsEntry | None = None
+        self.peak_memory = 0
+
+    def entry(self, strategy: str, node_type: str) -> StatsEntry:
+        key = (strategy, node_type)
+        if key not in self.entries:
+            self.entries[key] = StatsEntry()
+        return self.entries[key]
+
+    def attempt(self, strategy: str, node_type: str) -> StatsEntry:
+        """
+        starts a new attempt, the measured times are added to this entry
+        """
+        self.current = self.entry(strategy, node_type)
+        self.current.attempts += 1
+        return self.current
+
+    @contextmanager
+    def measure(self, kind: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current is not None:
+                setattr(
+                    self.current,
+                    kind,
+                    getattr(self.current, kind) + time.perf_counter() - start,
+                )
+
+    def total(self) -> StatsEntry:
+        result = StatsEntry()
+        for entry in self.entries.values():
+            result.update(entry)
+        return result
+
+    def update(self, other: Stats):
+        for (strategy, node_type), entry in other.entries.items():
+            self.entry(strategy, node_type).update(entry)
+        self.peak_memory = max(self.peak_memory, other.peak_memory)
+
+    def __getstate__(self):
+        return {**self.__dict__, "current": None}
+
+    def __str__(self):
+        header = ("strategy", "node type", "attempts", "accepted", *StatsEntry.kinds)
+        rows = [
+            (strategy, node_type, entry)
+            for (strategy, node_type), entry in sorted(
+                self.entries.items(), key=lambda item: -item[1].time
+            )
+        ]
+        rows.append(("total", "", self.total()))
+
+        lines = [
+            f"{header[0]:<20} {header[1]:<16}"
+            + "".join(f"{name:>10}" for name in header[2:])
+        ]
+        for strategy, node_type, entry in rows:
+            lines.append(
+                f"{strategy:<20} {node_type:<16}{entry.attempts:>10}{entry.accepted:>10}"
+                + "".join(f"{getattr(entry, kind):>10.3f}" for kind in entry.kinds)
+            )
+        total = rows[-1][2]
+        if total.skipped:
+            lines.append(f"skipped attempts: {total.skipped}")
+        if self.peak_memory:
+            lines.append(f"peak memory: {self.peak_memory / 2**20:.1f} MiB")
+        return "\n".join(lines)
+
+
+def measure(stats: Stats | None, kind: str):
+    """
+    measures the time of the with-block if `stats` is not None
+    """
+    if stats is None:
+        return nullcontext()
+    return stats.measure(kind)
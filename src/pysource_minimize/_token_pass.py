@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import ast
+import io
+import keyword
+import string
+import tokenize
+import warnings
+
+from ._minimize_base import AbortMinimization
+from ._minimize_base import StopMinimization
+from ._stats import measure
+
+
+def _tokens(source):
+    """
+    returns the tokens of the source together with their character offsets
+    """
+    line_offsets = [0]
+    for line in io.StringIO(source):
+        line_offsets.append(line_offsets[-1] + len(line))
+
+    def offset(position):
+        line, column = position
+        return line_offsets[line - 1] + column
+
+    return [
+        (token, offset(token.start), offset(token.end))
+        for token in tokenize.generate_tokens(io.StringIO(source).readline)
+    ]
+
+
+def _identifier(c):
+    return c.isalnum() or c == "_"
+
+
+def apply_edits(source, edits):
+    """
+    replaces the `(start, end, replacement)` ranges of the source
+    """
+    for start, end, replacement in sorted(edits, reverse=True):
+        if (
+            not replacement
+            and 0 < start
+            and end < len(source)
+            and _identifier(source[start - 1])
+            and _identifier(source[end])
+        ):
+            # `not(x)` should become `not x` and not `notx`
+            replacement = " "
+        source = source[:start] + replacement + source[end:]
+    return source
+
+
+def paren_pairs(tokens):
+    stack = []
+    groups = []
+    for token, start, end in tokens:
+        if token.type == tokenize.OP and token.string == "(":
+            stack.append((start, end))
+        elif token.type == tokenize.OP and token.string == ")" and stack:
+            open_start, open_end = stack.pop()
+            groups.append([(open_start, open_end, ""), (start, end, "")])
+    return groups
+
+
+def attribute_names(tokens):
+    return [
+        [(dot_start, name_end, "")]
+        for (dot, dot_start, _), (name, _, name_end) in zip(tokens, tokens[1:])
+        if dot.type == tokenize.OP and dot.string == "." and name.type == tokenize.NAME
+    ]
+
+
+def identifiers(tokens):
+    names = {}
+    for token, start, end in tokens:
+        if token.type == tokenize.NAME and not keyword.iskeyword(token.string):
+            names.setdefault(token.string, []).append((start, end))
+
+    def new_names():
+        for c in string.ascii_lowercase:
+            yield c
+        for c1 in string.ascii_lowercase:
+            for c2 in string.ascii_lowercase:
+                yield c1 + c2
+
+    unused = (
+        name
+        for name in new_names()
+        if name not in names and not keyword.iskeyword(name)
+    )
+
+    groups = []
+    for name, positions in sorted(names.items(), key=lambda item: -len(item[0])):
+        new_name = next(unused)
+        if len(new_name) >= len(name):
+            break
+        groups.append([(start, end, new_name) for start, end in positions])
+    return groups
+
+
+def literals(tokens):
+    groups = []
+    for token, start, end in tokens:
+        if token.type == tokenize.STRING:
+            prefix = token.string[
+                : len(token.string) - len(token.string.lstrip(string.ascii_letters))
+            ]
+            replacement = prefix + "''"
+        elif token.type == tokenize.NUMBER:
+            replacement = "0j" if token.string[-1] in "jJ" else "0"
+        else:
+            continue
+
+        if len(replacement) < len(token.string):
+            groups.append([(start, end, replacement)])
+    return groups
+
+
+class TokenPass:
+    """
+    minimizes the final source on the token level.
+
+    It removes redundant parentheses and attribute names, shortens identifiers and literals
+    and validates every candidate with `compile()` (or `ast.parse()`) and the checker.
+    """
+
+    transformations = (paren_pairs, attribute_names, identifiers, literals)
+
+    def __init__(
+        self, source, checker, *, compilable=True, with_code=False, stats=None
+    ):
+        self.source = source
+        self.checker = checker
+        self.compilable = compilable
+        self.with_code = with_code
+        self.stats = stats
+        self.stop = False
+
+        try:
+            changed = True
+            while changed:
+                changed = False
+                for transformation in self.transformations:
+                    if self.minimize_groups(transformation):
+                        changed = True
+        except StopMinimization:
+            self.stop = True
+        except AbortMinimization:
+            self.stop = True
+
+    def check(self, source, kind):
+        if self.stats is not None:
+            self.stats.attempt(type(self).__name__, kind)
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", SyntaxWarning)
+                with measure(self.stats, "compile"):
+                    if self.compilable:
+                        code = compile(source, "<string>", "exec", dont_inherit=True)
+                    else:
+                        ast.parse(source)
+        except Exception:
+            return False
+
+        result = False
+        try:
+            with measure(self.stats, "checker"):
+                if self.with_code:
+                    result = self.checker(source, code)
+                else:
+                    result = self.checker(source)
+        except StopMinimization:
+            result = True
+            raise
+        finally:
+            if result:
+                self.source = source
+                if self.stats is not None:
+                    self.stats.current.accepted += 1
+        return result
+
+    def minimize_groups(self, transformation) -> bool:
+        """
+        applies as many edit groups of the transformation as possible.
+
+        returns True if the source was changed.
+        """
+        base = self.source
+        groups = transformation(_tokens(base))
+        accepted: list[list[tuple[int, int, str]]] = []
+
+        def try_groups(chunk):
+            edits = [edit for group in accepted + chunk for edit in group]
+            if self.check(apply_edits(base, edits), transformation.__name__):
+                accepted.extend(chunk)
+                return True
+            return False
+
+        def divide(chunk):
+            if not chunk or try_groups(chunk) or len(chunk) == 1:
+                return
+            mid = len(chunk) // 2
+            divide(chunk[:mid])
+            divide(chunk[mid:])
+
+        divide(groups)
+        return bool(accepted)
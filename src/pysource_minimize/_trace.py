@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from types import FrameType
+from typing import IO
+
+
+class Tracer:
+    """
+    base class for tracers which get notified about the progress of the minimization.
+
+    All hooks get the time of the event (`time.perf_counter()`) and the number of ast nodes (`size`)
+    of the current tree or of the candidate.
+    `branch` is the name of the `minimize_*` method which created the candidate.
+    """
+
+    def on_round(self, *, round: int, size: int, time: float):
+        pass
+
+    def on_strategy_start(self, *, strategy: str, size: int, time: float):
+        pass
+
+    def on_strategy_end(self, *, strategy: str, size: int, time: float):
+        pass
+
+    def on_attempt(
+        self, *, strategy: str, node_type: str, branch: str, size: int, time: float
+    ):
+        pass
+
+    def on_accept(
+        self, *, strategy: str, node_type: str, branch: str, size: int, time: float
+    ):
+        pass
+
+    def on_reject(
+        self, *, strategy: str, node_type: str, branch: str, size: int, time: float
+    ):
+        pass
+
+
+class JsonlTracer(Tracer):
+    """
+    writes every event as one json object per line.
+
+    Example:
+        ``` python
+        with JsonlTracer("trace.jsonl") as tracer:
+            minimize(source, checker, tracer=tracer)
+        ```
+
+    Every line looks like `{"event": "accept", "time": ..., "size": ..., ...}`
+    and contains the arguments of the hook.
+    """
+
+    def __init__(self, file: str | Path | IO[str]):
+        if isinstance(file, (str, Path)):
+            self.file: IO[str] = open(file, "w", encoding="utf-8")
+            self.owns_file = True
+        else:
+            self.file = file
+            self.owns_file = False
+
+    def write(self, event: str, **data):
+        self.file.write(json.dumps({"event": event, **data}) + "\n")
+
+    def on_round(self, **data):
+        self.write("round", **data)
+
+    def on_strategy_start(self, **data):
+        self.write("strategy_start", **data)
+
+    def on_strategy_end(self, **data):
+        self.write("strategy_end", **data)
+
+    def on_attempt(self, **data):
+        self.write("attempt", **data)
+
+    def on_accept(self, **data):
+        self.write("accept", **data)
+
+    def on_reject(self, **data):
+        self.write("reject", **data)
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def current_branch() -> str:
+    """
+    returns the name of the innermost `minimize*` method of the caller
+    """
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None:
+        name = frame.f_code.co_name
+        if name.startswith("minimize") and "self" in frame.f_locals:
+            return name
+        frame = frame.f_back
+    return ""
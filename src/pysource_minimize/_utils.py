@@ -16,4 +16,26 @@ def parse(source: str) -> ast.Module:
     return ast.parse(source, type_comments=True)
 
 
+def memory_usage():
+    """
+    returns the resident set size of the current process in bytes or None if it is unknown
+    """
+    import os
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+
+    # this is the peak and not the current usage, but it is the best we can get here
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
 __all__ = ("unparse",)
@@ -0,0 +1,178 @@
+"""
+runs python commands in processes which are forked from a warm parent process (zygote).
+
+The zygote imports the modules of the tool once and forks a new child for every command.
+This module is also the source code of the zygote process and can only use the standard library.
+"""
+
+import base64
+import json
+import os
+import subprocess as sp
+import sys
+import tempfile
+from typing import List
+
+
+def parse_python_command(cmd: List[str]):
+    """
+    splits `python -m module args` or `python script.py args` into the interpreter and the arguments
+    """
+    if len(cmd) >= 3 and cmd[1] == "-m":
+        return cmd[0], cmd[1:]
+    if len(cmd) >= 2 and not cmd[1].startswith("-"):
+        return cmd[0], cmd[1:]
+    raise ValueError(
+        f"'{' '.join(cmd)}' has to be of the form 'python -m module ...' or 'python script.py ...'"
+    )
+
+
+class Zygote:
+    def __init__(self, python: str, preload: List[str], cwd=None):
+        with open(__file__, encoding="utf-8") as f:
+            source = f.read()
+
+        # the output of the zygote itself (a failing preload for example)
+        self.stderr = tempfile.TemporaryFile()
+
+        self.process = sp.Popen(
+            [python, "-c", source, *preload],
+            stdin=sp.PIPE,
+            stdout=sp.PIPE,
+            stderr=self.stderr,
+            cwd=cwd,
+        )
+
+    def run(self, args: List[str]) -> sp.CompletedProcess:
+        """
+        runs `python *args` in a forked child and captures the output like `subprocess.run()`
+        """
+        assert self.process.stdin and self.process.stdout
+        try:
+            self.process.stdin.write(json.dumps({"args": args}).encode() + b"\n")
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            pass
+
+        line = self.process.stdout.readline()
+        if not line:
+            self.process.wait()
+            self.stderr.seek(0)
+            output = self.stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(
+                "the zygote process terminated unexpectedly"
+                + (f":\n{output}" if output else "")
+            )
+
+        result = json.loads(line)
+        return sp.CompletedProcess(
+            args,
+            result["returncode"],
+            base64.b64decode(result["stdout"]),
+            base64.b64decode(result["stderr"]),
+        )
+
+    def close(self):
+        if self.process.stdin:
+            self.process.stdin.close()
+        self.process.wait()
+        self.stderr.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _run_child(args: List[str]) -> int:
+    import runpy
+
+    try:
+        if args[0] == "-m":
+            sys.argv = [args[1], *args[2:]]
+            runpy.run_module(args[1], run_name="__main__", alter_sys=True)
+        else:
+            sys.argv = list(args)
+            script = os.path.abspath(args[0])
+            sys.path[0] = os.path.dirname(script)
+            runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException as exc:
+        tb = exc.__traceback__
+        # hide the frames of the zygote like python does for its own frames
+        internal = (
+            _run_child.__code__.co_filename,
+            runpy.run_path.__code__.co_filename,
+        )
+        while tb is not None and tb.tb_frame.f_code.co_filename in internal:
+            tb = tb.tb_next
+        sys.excepthook(type(exc), exc.with_traceback(tb), tb)
+        return 1
+    return 0
+
+
+def _exit_code(status: int) -> int:
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _serve(preload: List[str], requests, channel):
+    import importlib
+
+    for module in preload:
+        importlib.import_module(module)
+
+    for line in requests:
+        args = json.loads(line)["args"]
+
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover
+                devnull = os.open(os.devnull, os.O_RDONLY)
+                os.dup2(devnull, 0)
+                os.dup2(out.fileno(), 1)
+                os.dup2(err.fileno(), 2)
+                sys.stdin = open(0, closefd=False)
+
+                code = _run_child(args)
+
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code & 0xFF)
+
+            _, status = os.waitpid(pid, 0)
+
+            out.seek(0)
+            err.seek(0)
+            result = {
+                "returncode": _exit_code(status),
+                "stdout": base64.b64encode(out.read()).decode(),
+                "stderr": base64.b64encode(err.read()).decode(),
+            }
+
+        channel.write(json.dumps(result) + "\n")
+        channel.flush()
+
+
+def _main():
+    # the original stdout is used for the protocol,
+    # everything which is printed by the zygote itself goes to stderr
+    channel = os.fdopen(os.dup(1), "w")
+    os.dup2(2, 1)
+
+    _serve(sys.argv[1:], sys.stdin, channel)
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,5 +1,8 @@
+import json
 import os
+import py_compile
 import re
+import subprocess as sp
 import sys
 from pathlib import Path
 from traceback import format_tb
@@ -9,7 +12,9 @@ from typing import Optional
 import pytest
 from click.testing import CliRunner
 from inline_snapshot import snapshot
+from pysource_minimize.__main__ import invalidate_bytecode
 from pysource_minimize.__main__ import main
+from pysource_minimize._zygote import Zygote
 
 
 def minimize_files(
@@ -171,6 +176,38 @@ print("sum", sum(l))
     )
 
 
+def test_format_changes_the_output():
+    files = {
+        "bug.py": """\
+x=1
+raise ValueError('BUG')
+""",
+    }
+
+    minimize_files(
+        files,
+        track="ValueError('BUG')",
+        extra_args=["--format", "-w"],
+        run=[sys.executable, "-c", "import bug"],
+        expected_output=snapshot("""\
+You can support my work by sponsoring me on GitHub ❤ github.com/sponsors/15r10nk
+
+
+The minimized code is:
+╭─ bug.py ─────────────────────────────────────────────────────────────────────╮
+│   1 raise ValueError("BUG")                                                  │
+│   2                                                                          │
+╰──────────────────────────────────────────────────────────────────────────────╯
+
+Please report if your code can be further simplified. This will help \n\
+pysource-minimize to improve further.
+
+minimized files saved
+"""),
+        expected_files=snapshot({"bug.py": "raise ValueError('BUG')"}),
+    )
+
+
 def test_no_track():
     files = {
         "bug.py": f"""\
@@ -241,3 +278,162 @@ original files restored
                 {"-w": {"bug.py": "print('a' + 'aa')"}, """""": "<unchanged>"}
             )[key],
         )
+
+
+def test_invalidate_bytecode(tmp_path):
+    for name in ("bug.py", "other.py"):
+        (tmp_path / name).write_text("x=1")
+        py_compile.compile(str(tmp_path / name))
+
+    invalidate_bytecode(tmp_path / "bug.py")
+
+    assert [p.name.split(".")[0] for p in (tmp_path / "__pycache__").iterdir()] == [
+        "other"
+    ]
+
+
+def test_no_ui():
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        Path("bug.py").write_text('print("aa"+"aa","bbb")\n')
+
+        result = runner.invoke(
+            main,
+            [
+                "--file=bug.py",
+                "--no-ui",
+                "--track",
+                "aaa",
+                "--",
+                sys.executable,
+                "bug.py",
+            ],
+        )
+
+        *checks, summary = [json.loads(line) for line in result.output.splitlines()]
+
+        assert Path("bug.py").read_text() == 'print("aa"+"aa","bbb")\n'
+
+    assert [check["check"] for check in checks] == list(range(1, len(checks) + 1))
+    assert all(
+        check.keys() == {"check", "file", "verdict", "size", "elapsed", "checker_time"}
+        for check in checks
+    )
+    assert {check["file"] for check in checks} == {"bug.py"}
+    assert {check["verdict"] for check in checks} == {True, False}
+
+    assert summary["saved"] is False
+    assert "'a' + 'aa'" in summary["result"]["bug.py"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+def test_zygote(tmp_path):
+    script = tmp_path / "script.py"
+    script.write_text("""\
+import sys
+print("out", sys.argv[1:])
+print("err", file=sys.stderr)
+def f():
+    1/0
+if sys.argv[1] == "fail":
+    f()
+sys.exit(int(sys.argv[1]))
+""")
+
+    with Zygote(sys.executable, ["json"]) as zygote:
+        for arg in ("0", "3", "fail"):
+            expected = sp.run([sys.executable, str(script), arg], capture_output=True)
+            result = zygote.run([str(script), arg])
+
+            assert result.returncode == expected.returncode
+            assert result.stdout == expected.stdout
+            assert result.stderr == expected.stderr
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+def test_zygote_preload_error():
+    with Zygote(sys.executable, ["module_which_does_not_exist"]) as zygote:
+        with pytest.raises(RuntimeError, match="ModuleNotFoundError"):
+            zygote.run(["-c", "pass"])
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+@pytest.mark.skipif(
+    sys.version_info < (3, 9), reason="unparse behaves different for 3.8"
+)
+def test_preload():
+    minimize_files(
+        {"bug.py": 'print("aa"+"aa","bbb")\n'},
+        track="aaa",
+        extra_args=["-w", "--preload", "json"],
+        expected_output=snapshot("""\
+You can support my work by sponsoring me on GitHub ❤ github.com/sponsors/15r10nk
+
+
+The minimized code is:
+╭─ bug.py ─────────────────────────────────────────────────────────────────────╮
+│   1 print('a' + 'aa')                                                        │
+╰──────────────────────────────────────────────────────────────────────────────╯
+
+Please report if your code can be further simplified. This will help \n\
+pysource-minimize to improve further.
+
+minimized files saved
+"""),
+        expected_files=snapshot({"bug.py": "print('a' + 'aa')"}),
+    )
+
+
+def test_scratch():
+    files = {
+        "bug.py": """\
+from var_a import a
+from var_d import d
+print(d[a],"b")
+""",
+        "var_a.py": """\
+a=1+2+3
+""",
+        "var_d.py": """\
+d={0:1,5:8}
+""",
+    }
+
+    minimize_files(
+        files,
+        track="KeyError",
+        minimize=["bug.py", "var_a.py"],
+        extra_args=["--scratch", "-w"],
+        expected_output=snapshot("""\
+You can support my work by sponsoring me on GitHub ❤ github.com/sponsors/15r10nk
+
+
+The minimized code is:
+╭─ bug.py ─────────────────────────────────────────────────────────────────────╮
+│   1 from var_a import a                                                      │
+│   2 from var_d import d                                                      │
+│   3 d[a]                                                                     │
+╰──────────────────────────────────────────────────────────────────────────────╯
+
+╭─ var_a.py ───────────────────────────────────────────────────────────────────╮
+│   1 a = 1                                                                    │
+╰──────────────────────────────────────────────────────────────────────────────╯
+
+Please report if your code can be further simplified. This will help \n\
+pysource-minimize to improve further.
+
+minimized files saved
+"""),
+        expected_files=snapshot(
+            {
+                "bug.py": """\
+from var_a import a
+from var_d import d
+d[a]\
+""",
+                "var_a.py": "a = 1",
+                "var_d.py": "d={0:1,5:8}\n",
+            }
+        ),
+    )
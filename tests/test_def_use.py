@@ -0,0 +1,74 @@
+import ast
+import contextlib
+import io
+
+from inline_snapshot import snapshot
+from pysource_minimize import minimize
+from pysource_minimize._def_use import DefUseIndex
+from pysource_minimize._minimize_structure import MinimizeStructure
+from pysource_minimize._utils import unparse
+
+from .utils import testing_enabled
+
+
+def test_dangling_uses():
+    tree = ast.parse("""\
+import os
+x = 1
+x = 2
+def f():
+    return os.sep
+os.path
+""")
+    index = DefUseIndex(tree)
+    import_os, x1, x2, f, os_path = tree.body
+
+    def live(node):
+        return True
+
+    assert index.dangling_uses(import_os, live) == [f.body[0], os_path]
+    assert index.dangling_uses(x1, live) == []
+    assert index.dangling_uses(x1, lambda node: node is not x2) == []
+    assert index.dangling_uses(f, live) == []
+
+
+def test_remove_definition_with_uses():
+    source = """\
+x = 1
+def f():
+    print(x)
+    print("bug")
+f()
+"""
+
+    def checker(tree):
+        out = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out):
+                exec(unparse(tree), {})
+        except Exception:
+            return False
+        return "bug" in out.getvalue()
+
+    with testing_enabled():
+        # a single run of the strategy has to remove `x` and its usage
+        minimizer = MinimizeStructure(ast.parse(source), checker, lambda *a: None)
+
+    assert unparse(minimizer.get_current_tree({})) == snapshot("""\
+def f():
+    print('bug')
+f()\
+""")
+
+
+def test_replaced_elements_stay_in_list():
+    candidates = []
+
+    def checker(source):
+        candidates.append(source)
+        return "a" in source and "f" in source
+
+    minimize("x = [a, f(b)]", checker, retries=0)
+
+    # `f(b)` was replaced by `f`, the list has still two elements
+    assert "a" not in candidates
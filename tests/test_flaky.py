@@ -0,0 +1,125 @@
+import ast
+import random
+from pathlib import Path
+
+from inline_snapshot import snapshot
+from pysource_minimize import FlakyChecker
+from pysource_minimize import minimize
+
+
+def test_flaky_checker_repeats_contradictions():
+    results = iter([True, False, True])
+    calls = []
+
+    def checker(source):
+        calls.append(source)
+        return next(results)
+
+    flaky = FlakyChecker(checker, confidence=0.9, max_repeats=3)
+
+    assert flaky("a")
+    # "a" was accepted before, the rejection has to be a flake
+    assert flaky("a")
+    assert calls == ["a", "a", "a"]
+    assert flaky.flake_rate == 1 / 3
+
+
+def test_flaky_checker_trusts_reliable_checker():
+    calls = []
+
+    def checker(source):
+        calls.append(source)
+        return source == "a"
+
+    flaky = FlakyChecker(checker)
+
+    assert flaky("a")
+    assert not flaky("b")
+    assert flaky("a")
+    assert calls == ["a", "b", "a"]
+    assert flaky.flake_rate == 0
+
+
+def test_flaky_checker_trusts_new_rejections():
+    results = iter([True, False, True])
+    calls = []
+
+    def checker(source):
+        calls.append(source)
+        return next(results)
+
+    flaky = FlakyChecker(checker, confidence=0.99, max_repeats=3)
+
+    assert flaky("a")
+    # nothing contradicts the rejection of "b"
+    assert not flaky("b")
+    # the rejection of "b" was wrong
+    assert flaky("b")
+    assert calls == ["a", "b", "b"]
+    assert flaky.flake_rate == 1 / 3
+
+
+def test_flaky_checker_delta():
+    results = iter([True, True, False, False, False, True])
+    calls = []
+
+    def checker(changes, current_file):
+        calls.append(changes)
+        return next(results)
+
+    a = Path("a.py")
+    b = Path("b.py")
+
+    flaky = FlakyChecker(checker)
+
+    assert flaky({a: "1", b: "1"}, a)
+    assert flaky({a: "2"}, a)
+    assert not flaky({a: "1", b: "2"}, a)
+    # the same changes as before, but a different state of the files
+    assert not flaky({a: "2"}, a)
+    # the state of the second call
+    assert flaky({b: "1"}, b)
+    assert calls == [
+        {a: "1", b: "1"},
+        {a: "2"},
+        {a: "1", b: "2"},
+        {a: "2"},
+        {b: "1"},
+        {b: "1"},
+    ]
+
+
+def test_flaky_checker_tree():
+    results = iter([True, False, False, True])
+    calls = 0
+
+    def checker(tree):
+        nonlocal calls
+        calls += 1
+        return next(results)
+
+    flaky = FlakyChecker(checker)
+
+    assert flaky(ast.parse("x = 1"))
+    assert not flaky(ast.parse("x = 2"))
+    # an equal tree which was accepted before
+    assert flaky(ast.parse("x = 1"))
+    assert calls == 4
+
+
+def test_minimize_flaky_problem():
+    source = """
+def f():
+    print("bug"+"other string")
+    return 1+1
+f()
+"""
+    rnd = random.Random(5)
+
+    def checker(source):
+        return "bug" in source and rnd.random() > 0.3
+
+    flaky = FlakyChecker(checker, confidence=0.99, max_repeats=10)
+
+    assert minimize(source, flaky, retries=3) == snapshot('"""bug"""')
+    assert 0.1 < flaky.flake_rate < 0.5
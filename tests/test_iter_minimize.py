@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from inline_snapshot import snapshot
+from pysource_minimize import CouldNotMinimize
+from pysource_minimize import iter_minimize
+from pysource_minimize import minimize
+
+source = """
+def f():
+    print("bug"+"other string")
+    return 1+1
+f()
+"""
+
+
+def checker(source):
+    return "bug" in source
+
+
+def test_iter_minimize():
+    results = list(iter_minimize(source, checker))
+
+    assert results == snapshot(
+        [
+            """\
+def f():
+    print('bug' + 'other string')
+    return 1 + 1\
+""",
+            """\
+def f():
+    print('bug' + 'other string')\
+""",
+            """\
+def f():
+    'bug' + 'other string'\
+""",
+            '''\
+def f():
+    """bug"""\
+''',
+            '"""bug"""',
+        ]
+    )
+    assert results[-1] == minimize(source, checker)
+
+
+def test_stop_iteration():
+    calls = 0
+
+    def counting_checker(source):
+        nonlocal calls
+        calls += 1
+        return checker(source)
+
+    results = iter_minimize(source, counting_checker)
+    first = next(results)
+    results.close()
+
+    calls_after_close = calls
+    assert "bug" in first
+    assert list(results) == []
+    assert calls == calls_after_close
+
+
+def test_errors():
+    with pytest.raises(CouldNotMinimize):
+        next(iter_minimize(source, lambda source: False))
+
+    def failing_checker(source):
+        raise ZeroDivisionError()
+
+    with pytest.raises(ZeroDivisionError):
+        list(iter_minimize(source, failing_checker))
+
+
+def test_checker_thread():
+    threads = set()
+
+    def thread_checker(source):
+        threads.add(threading.get_ident())
+        return checker(source)
+
+    assert list(iter_minimize(source, thread_checker))[-1] == '"""bug"""'
+    # the checker is called in the thread which iterates over the results
+    assert threads == {threading.get_ident()}
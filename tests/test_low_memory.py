@@ -0,0 +1,61 @@
+import pytest
+from inline_snapshot import snapshot
+from pysource_minimize import minimize
+from pysource_minimize import Stats
+from pysource_minimize._utils import memory_usage
+
+source = """
+def f():
+    print("bug"+"other string")
+    return 1+1
+f()
+"""
+
+
+def checker(source):
+    return "bug" in source
+
+
+def test_low_memory():
+    assert minimize(source, checker, low_memory=True) == minimize(source, checker)
+
+
+@pytest.mark.skipif(memory_usage() is None, reason="memory usage is unknown")
+def test_memory_limit():
+    stats = Stats()
+    minimize(source, checker, stats=stats)
+    assert stats.peak_memory > 0
+    assert "peak memory" in str(stats)
+
+    with pytest.warns(UserWarning, match="memory limit"):
+        result = minimize(source, checker, memory_limit=1)
+
+    assert result == snapshot("""\
+def f():
+    print('bug' + 'other string')
+    return 1 + 1
+f()\
+""")
+
+
+def test_memory_limit_keeps_progress(monkeypatch):
+    calls = 0
+
+    def fake_memory_usage():
+        nonlocal calls
+        calls += 1
+        return 1000 if calls < 5 else 2000
+
+    monkeypatch.setattr(
+        "pysource_minimize._minimize_base.memory_usage", fake_memory_usage
+    )
+
+    with pytest.warns(UserWarning, match="memory limit"):
+        result = minimize(source, checker, memory_limit=1500)
+
+    # the changes which were accepted before the limit was reached are kept
+    assert result == snapshot("""\
+def f():
+    print('bug' + 'other string')
+    return 1 + 1\
+""")
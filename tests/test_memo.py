@@ -0,0 +1,102 @@
+import ast
+
+from inline_snapshot import snapshot
+from pysource_minimize import minimize
+from pysource_minimize import Stats
+from pysource_minimize._minimize_value import MinimizeValue
+
+source = """
+def f(a, b):
+    x = a + b
+    print("bug", x)
+    return [1, 2, 3]
+
+class C:
+    def g(self):
+        return f(1, 2)
+
+C().g()
+"""
+
+
+def checker(source):
+    return "bug" in source and "C" in source and "+" in source
+
+
+def test_memo():
+    stats = Stats()
+    memo_stats = Stats()
+
+    result = minimize(source, checker, retries=2, stats=stats)
+    assert minimize(source, checker, retries=2, memo=True, stats=memo_stats) == result
+
+    total = stats.total()
+    memo_total = memo_stats.total()
+    assert total.skipped == 0
+    assert memo_total.skipped > 0
+    assert memo_total.attempts + memo_total.skipped == total.attempts
+    assert (memo_total.attempts, total.attempts) == snapshot((60, 101))
+
+    assert "skipped attempts:" in str(memo_stats)
+
+
+def test_changed_scope():
+    def checker(source):
+        # `b` can only be removed after `a` is removed
+        return "a" not in source or "b" in source
+
+    # the failed removal of `b` is retried because the module was changed
+
+    assert minimize("a=1\nb=2", checker, retries=1, memo=True) == snapshot("0")
+
+
+def memo_key(source, value):
+    class KeysOnly(MinimizeValue):
+        def minimize_stmt(self, stmt):
+            pass
+
+    minimizer = KeysOnly(ast.parse(source), lambda tree: True, lambda *args: None)
+    (constant,) = [
+        node
+        for node in ast.walk(minimizer.original_ast)
+        if isinstance(node, ast.Constant) and node.value == 100
+    ]
+    return minimizer.memo_key({(minimizer.index_of(constant), "value"): value})
+
+
+def test_attribute_values_are_no_indices():
+    function = "def f():\n    return 100\n"
+
+    # the node indices change when statements of other scopes are removed
+    assert memo_key("x=1\ny=2\n" + function, 9) != memo_key(function, 3)
+    assert memo_key("x=1\ny=2\n" + function, 9) == memo_key(function, 9)
+
+
+def test_removed_statement_between_rounds():
+    source = """
+x = 1
+y = 2
+def f():
+    return 100
+"""
+
+    def checker(source):
+        tree = ast.parse(source)
+        values = [
+            node.value.value
+            for node in ast.walk(tree)
+            if isinstance(node, ast.Return) and isinstance(node.value, ast.Constant)
+        ]
+        if len(values) != 1 or type(values[0]) is not int or values[0] < 7:
+            return False
+        # `x` and `y` can only be removed in the second round
+        return ("x" in source and "y" in source) or values[0] < 50
+
+    stats = Stats()
+    result = minimize(source, checker, retries=1, memo=True, stats=stats)
+    assert result == minimize(source, checker, retries=1)
+    assert result == snapshot("""\
+def f():
+    return 7\
+""")
+    assert stats.total().skipped > 0
@@ -1,6 +1,7 @@
 from pathlib import Path
 from pathlib import PosixPath
 
+import pytest
 from inline_snapshot import snapshot
 from pysource_minimize._minimize import minimize_all
 
@@ -39,3 +40,109 @@ x=2
             }
         )
     )
+
+
+def check_bug_in_every_file(sources, current_file):
+    return all(source is not None and "bug" in source for source in sources.values())
+
+
+def test_minimize_independent_files():
+    files = {
+        Path("a.py"): "x=1\nprint('bug')\n",
+        Path("b.py"): "y='bug'+'x'\n",
+        Path("c.py"): "z=[1,'a bug']\n",
+    }
+
+    expected = minimize_all(files, check_bug_in_every_file)
+
+    assert expected == snapshot(
+        {
+            PosixPath("a.py"): '"""bug"""',
+            PosixPath("b.py"): '"""bug"""',
+            PosixPath("c.py"): '"""bug"""',
+        }
+    )
+
+    assert minimize_all(files, check_bug_in_every_file, independent=True) == expected
+    assert (
+        minimize_all(
+            files,
+            check_bug_in_every_file,
+            groups=[[Path("c.py")], [Path("a.py"), Path("b.py")]],
+            jobs=2,
+        )
+        == expected
+    )
+
+
+def test_groups_have_to_be_a_partition():
+    files = {Path("a.py"): "'bug'", Path("b.py"): "'bug'"}
+
+    with pytest.raises(ValueError):
+        minimize_all(files, check_bug_in_every_file, groups=[[Path("a.py")]])
+
+    with pytest.raises(ValueError):
+        minimize_all(
+            files,
+            check_bug_in_every_file,
+            groups=[[Path("a.py"), Path("b.py")], [Path("a.py")]],
+        )
+
+
+def test_delete_many_files():
+    files = {Path(f"file_{i}.py"): f"x={i}" for i in range(64)}
+    files[Path("file_10.py")] = "'bug'"
+    files[Path("file_50.py")] = "'bug'"
+
+    calls = 0
+
+    def check(sources, current_file):
+        nonlocal calls
+        if all(source in (None, files[path]) for path, source in sources.items()):
+            # only files are deleted
+            calls += 1
+        return all(
+            "bug" in (sources[path] or "")
+            for path in (Path("file_10.py"), Path("file_50.py"))
+        )
+
+    result = minimize_all(files, check)
+
+    assert {path: source for path, source in result.items() if source is not None} == {
+        Path("file_10.py"): '"""bug"""',
+        Path("file_50.py"): '"""bug"""',
+    }
+    assert calls < len(files) / 2
+
+
+def test_delta_checker():
+    files = {
+        Path("a.py"): "x=1\nprint('bug')\n",
+        Path("b.py"): "y='bug'+'x'\n",
+        Path("c.py"): "z=2\n",
+    }
+
+    full_calls = []
+
+    def check(sources, current_file):
+        full_calls.append(dict(sources))
+        return check_bug_in_every_file(
+            {path: sources[path] for path in (Path("a.py"), Path("b.py"))}, current_file
+        )
+
+    delta_calls = []
+    changed_files = []
+    state = {}
+
+    def delta_check(changes, current_file):
+        changed_files.append(len(changes))
+        state.update(changes)
+        delta_calls.append(dict(state))
+        return check_bug_in_every_file(
+            {path: state[path] for path in (Path("a.py"), Path("b.py"))}, current_file
+        )
+
+    assert minimize_all(files, delta_check, delta=True) == minimize_all(files, check)
+    assert delta_calls == full_calls
+    assert changed_files[0] == 3
+    assert max(changed_files[1:]) <= 2
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import time
+
+from inline_snapshot import snapshot
+from pysource_minimize import minimize
+from pysource_minimize import Stats
+from pysource_minimize._minimize_cost import smaller_values
+
+source = """
+data = [0] * 10**6
+for i in range(5000000):
+    pass
+text = "abc" * 20000
+print(len(data) + len(text), i, "bug")
+"""
+
+
+def checker(source):
+    out = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(out):
+            exec(source, {})
+    except Exception:
+        return False
+    # the loop is needed to reproduce the problem
+    return "bug" in out.getvalue() and "for" in source
+
+
+def test_smaller_values():
+    assert list(smaller_values(1234)) == snapshot([0, 1, 10, 100, 1000])
+    assert list(smaller_values(0)) == []
+
+
+def test_reduce_latency():
+    stats = Stats()
+    assert minimize(source, checker, reduce_latency=0, stats=stats) == snapshot("""\
+for unique_name_0 in range(0):
+    pass
+print('bug')\
+""")
+
+    attempts = {
+        node_type: entry.attempts
+        for (strategy, node_type), entry in stats.entries.items()
+        if strategy == "MinimizeCost"
+    }
+    assert attempts == snapshot({"Module": 1, "Constant": 3, "BinOp": 1})
+
+
+def test_fast_checker():
+    stats = Stats()
+    minimize(
+        "for i in range(1000):\n    print('bug')",
+        checker,
+        # every checker is fast compared to this
+        reduce_latency=60,
+        stats=stats,
+    )
+    # only the original source was checked
+    assert [key for key in stats.entries if key[0] == "MinimizeCost"] == [
+        ("MinimizeCost", "Module")
+    ]
+
+
+def test_prefer_lower_latency():
+    def slow_checker(source):
+        # only the long string makes the check slow
+        time.sleep(0.2 if "a" * 100 in source else 0)
+        return "print" in source
+
+    stats = Stats()
+    minimize(
+        f"x = 100000\ny = 5000\nz = '{'a' * 300}'\nprint(x, y, z)",
+        slow_checker,
+        reduce_latency=0.1,
+        stats=stats,
+    )
+
+    # the reduction of x (an int) did not lower the latency,
+    # the string is reduced before y and the checks are fast afterwards
+    attempts = {
+        node_type: entry.attempts
+        for (strategy, node_type), entry in stats.entries.items()
+        if strategy == "MinimizeCost"
+    }
+    assert attempts == snapshot({"Module": 1, "Constant": 2})
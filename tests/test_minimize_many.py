@@ -0,0 +1,55 @@
+import time
+
+from inline_snapshot import snapshot
+from pysource_minimize import CouldNotMinimize
+from pysource_minimize import minimize
+from pysource_minimize import minimize_many
+
+
+def checker(source):
+    return "bug" in source
+
+
+sources = [
+    "x = 1\nprint('bug' + 'other string')",
+    "def f():\n    return 'bug'\nf()",
+    "x = 1\nprint('bug' + 'other string')",
+    "y = 2",
+]
+
+
+def slow_checker(source):
+    if "slow" in source:
+        time.sleep(0.5)
+    return "bug" in source
+
+
+def test_break():
+    slow_source = "\n".join(f"slow_{i} = {i}" for i in range(40)) + "\nprint('bug')"
+
+    start = time.monotonic()
+    for index, result in minimize_many(
+        [slow_source, "x = 1\nprint('bug')"], slow_checker, jobs=2
+    ):
+        break
+
+    assert index == 1
+    # the minimization of the slow source needs more than 20 seconds
+    assert time.monotonic() - start < 5
+
+
+def test_minimize_many():
+    results = dict(minimize_many(sources, checker, jobs=2))
+
+    assert sorted(results) == [0, 1, 2, 3]
+    for index in (0, 1, 2):
+        assert results[index] == minimize(sources[index], checker)
+    assert results[0] == snapshot('"""bug"""')
+
+    assert isinstance(results[3], CouldNotMinimize)
+
+
+def test_budget():
+    # the budget is used up before the first check
+    results = dict(minimize_many(sources[:2], checker, jobs=2, budget=0))
+    assert results == {0: sources[0], 1: sources[1]}
@@ -0,0 +1,68 @@
+import ast
+
+import pytest
+from inline_snapshot import snapshot
+from pysource_minimize import _minimize
+from pysource_minimize import CouldNotMinimize
+from pysource_minimize import minimize_tree
+from pysource_minimize._utils import unparse
+
+source = """
+def f(a, b):
+    print("bug" + "other string")
+    return a + b
+f(1, 2)
+"""
+
+
+def has_bug(tree):
+    return any(
+        isinstance(node, ast.Constant) and node.value == "bug"
+        for node in ast.walk(tree)
+    )
+
+
+def test_minimize_tree():
+    tree = ast.parse(source)
+    original = ast.dump(tree)
+
+    result = minimize_tree(tree, has_bug)
+
+    assert ast.dump(tree) == original
+    assert unparse(result) == snapshot('"""bug"""')
+    assert not any("_MinimizeBase__index" in node.__dict__ for node in ast.walk(result))
+
+
+def test_candidates_are_not_unparsed(monkeypatch):
+    def no_unparse(tree):
+        raise AssertionError("unparse should not be called")
+
+    monkeypatch.setattr(_minimize, "unparse", no_unparse)
+    minimize_tree(ast.parse(source), has_bug)
+
+
+def test_compilable():
+    def checker(tree):
+        compile(ast.fix_missing_locations(tree), "<ast>", "exec")
+        return has_bug(tree)
+
+    result = minimize_tree(ast.parse(source), checker, compilable=True)
+    assert ast.dump(result) == snapshot(
+        "Module(body=[Expr(value=Constant(value='bug'))], type_ignores=[])"
+    )
+
+
+def test_could_not_minimize():
+    with pytest.raises(CouldNotMinimize):
+        minimize_tree(ast.parse(source), lambda tree: False)
+
+
+def test_checker_modifies_candidates():
+    def destructive_checker(tree):
+        result = has_bug(tree)
+        tree.body.clear()
+        return result
+
+    for prepass in (False, True):
+        result = minimize_tree(ast.parse(source), destructive_checker, prepass=prepass)
+        assert unparse(result) == snapshot('"""bug"""')
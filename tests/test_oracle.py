@@ -0,0 +1,38 @@
+import sys
+import time
+
+from pysource_minimize._oracle import Oracle
+
+
+def run(oracle, code):
+    return oracle.run([sys.executable, "-c", code])
+
+
+def test_track():
+    assert run(Oracle("bug"), "print('a bug')")
+    assert run(Oracle("bug"), "import sys;print('a bug',file=sys.stderr)")
+    assert not run(Oracle("bug"), "print('something else')")
+
+
+def test_early_termination():
+    start = time.perf_counter()
+    assert run(Oracle("bug"), "import time;print('bug',flush=True);time.sleep(60)")
+    assert time.perf_counter() - start < 30
+
+
+def test_regex():
+    assert run(Oracle(r"bug \d+", regex=True), "print('bug 123')")
+    assert not run(Oracle(r"bug \d+", regex=True), "print('bug x')")
+
+
+def test_returncode():
+    assert run(Oracle(None, returncode=5), "exit(5)")
+    assert not run(Oracle(None, returncode=5), "exit(4)")
+    assert run(Oracle("bug", returncode=5), "print('bug');exit(5)")
+    assert not run(Oracle("bug", returncode=5), "print('bug');exit(0)")
+    assert not run(Oracle("bug", returncode=5), "exit(5)")
+
+
+def test_long_output():
+    # the track is split between two reads
+    assert run(Oracle("bug"), "print('x'*65535+'bug'+'x'*100000)")
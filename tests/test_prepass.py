@@ -0,0 +1,72 @@
+import ast
+
+from inline_snapshot import snapshot
+from pysource_minimize import minimize
+from pysource_minimize import StopMinimization
+from pysource_minimize._prepass import CoarsePrepass
+from pysource_minimize._utils import unparse
+
+source = """
+import os
+x = 1
+class A:
+    a = 1
+    def f(self):
+        y = 2
+        print("bug")
+        return y
+    b = 2
+def g():
+    pass
+A().f()
+"""
+
+
+def checker(source):
+    return "bug" in source
+
+
+def tree_checker(tree):
+    return checker(unparse(tree))
+
+
+def test_coarse_prepass():
+    original = ast.parse(source)
+    prepass = CoarsePrepass(original, tree_checker)
+
+    assert unparse(prepass.tree) == snapshot("""\
+class A:
+
+    def f(self):
+        print('bug')\
+""")
+    # the original tree is not changed
+    assert unparse(original) == unparse(ast.parse(source))
+
+
+def test_prepass_stop():
+    def stop_checker(tree):
+        source = unparse(tree)
+        if "bug" not in source:
+            return False
+        if "x = 1" not in source:
+            # the candidate is accepted
+            raise StopMinimization
+        return True
+
+    prepass = CoarsePrepass(ast.parse(source), stop_checker)
+    assert prepass.stop
+    assert unparse(prepass.tree) == snapshot("""\
+class A:
+    a = 1
+
+    def f(self):
+        y = 2
+        print('bug')
+        return y
+    b = 2\
+""")
+
+
+def test_minimize_with_prepass():
+    assert minimize(source, checker, prepass=True) == minimize(source, checker)
@@ -0,0 +1,118 @@
+import contextlib
+import multiprocessing
+import socket
+import struct
+import threading
+from pathlib import Path
+
+import pytest
+from inline_snapshot import snapshot
+from pysource_minimize import CouldNotMinimize
+from pysource_minimize import minimize_all
+from pysource_minimize import MinimizeClient
+from pysource_minimize import MinimizeService
+from pysource_minimize import MinimizeWorker
+from pysource_minimize import ServiceError
+from pysource_minimize._service import parse_address
+
+authkey = b"test"
+
+
+def check_bug(files, current_file):
+    return any(source is not None and "bug" in source for source in files.values())
+
+
+def never(files, current_file):
+    return False
+
+
+def fails(files, current_file):
+    raise ZeroDivisionError()
+
+
+def run_worker(address):
+    MinimizeWorker(address, authkey=authkey).run()
+
+
+@contextlib.contextmanager
+def running_service(address):
+    with MinimizeService(address, authkey=authkey) as service:
+        service.start()
+        workers = [
+            multiprocessing.Process(target=run_worker, args=(service.address,))
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        yield service
+    for worker in workers:
+        worker.join(5)
+
+
+@pytest.fixture
+def service(tmp_path):
+    with running_service(str(tmp_path / "service.sock")) as service:
+        yield service
+
+
+sources = {
+    Path("a.py"): "x = 1\ny = 2\nprint('bug' + 'other')",
+    Path("b.py"): "import a\nz = [1, 2, 3]",
+}
+
+
+def test_service(service):
+    client = MinimizeClient(service.address, authkey=authkey)
+
+    results = [None, None]
+
+    def submit(i):
+        results[i] = client.minimize(sources, "tests.test_service:check_bug")
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = minimize_all(sources, check_bug)
+    assert results == [expected, expected]
+    assert expected == snapshot({Path("a.py"): '"""bug"""', Path("b.py"): None})
+
+    # the verdicts of the first jobs are reused
+    evaluations = service.evaluations
+    assert client.minimize(sources, "tests.test_service:check_bug") == expected
+    assert service.evaluations == evaluations
+
+
+def test_errors(service):
+    client = MinimizeClient(service.address, authkey=authkey)
+
+    with pytest.raises(CouldNotMinimize):
+        client.minimize(sources, "tests.test_service:never")
+
+    with pytest.raises(ServiceError, match="ZeroDivisionError"):
+        client.minimize(sources, "tests.test_service:fails")
+
+    with pytest.raises(ServiceError, match="unknown options: jobs"):
+        client.minimize(sources, "tests.test_service:check_bug", jobs=2)
+
+
+def test_connection_reset():
+    with running_service(("localhost", 0)) as service:
+        # a client which resets the connection during the authentication
+        connection = socket.create_connection(service.address)
+        connection.setsockopt(
+            socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+        )
+        connection.close()
+
+        client = MinimizeClient(service.address, authkey=authkey)
+        assert client.minimize(sources, "tests.test_service:check_bug") == snapshot(
+            {Path("a.py"): '"""bug"""', Path("b.py"): None}
+        )
+
+
+def test_parse_address():
+    assert parse_address("localhost:6000") == ("localhost", 6000)
+    assert parse_address("/tmp/minimize.sock") == "/tmp/minimize.sock"
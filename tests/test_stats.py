@@ -0,0 +1,65 @@
+from pathlib import Path
+
+from inline_snapshot import snapshot
+from pysource_minimize import minimize
+from pysource_minimize import Stats
+from pysource_minimize._minimize import minimize_all
+
+from .test_minimize_all import check_bug_in_every_file
+
+
+def counts(stats):
+    return {
+        key: (entry.attempts, entry.accepted)
+        for key, entry in sorted(stats.entries.items())
+    }
+
+
+def test_minimize_stats():
+    source = """
+def f():
+    print("bug"+"other string")
+    return 1+1
+f()
+"""
+    stats = Stats()
+    assert minimize(source, lambda source: "bug" in source, stats=stats) == snapshot(
+        '"""bug"""'
+    )
+
+    assert counts(stats)[("MinimizeStructure", "FunctionDef")] == snapshot((5, 2))
+
+    total = stats.total()
+    assert total.attempts == sum(entry.attempts for entry in stats.entries.values())
+    assert total.accepted == snapshot(6)
+    assert total.time > 0
+    assert total.get_ast > 0 and total.unparse > 0 and total.compile > 0
+
+    assert str(stats).splitlines()[0].split() == snapshot(
+        [
+            "strategy",
+            "node",
+            "type",
+            "attempts",
+            "accepted",
+            "get_ast",
+            "unparse",
+            "compile",
+            "checker",
+        ]
+    )
+
+
+def test_minimize_all_stats():
+    sources = {Path(f"f{i}.py"): f"x={i}\n'bug'" for i in range(3)}
+    stats = Stats()
+    minimize_all(sources, check_bug_in_every_file, stats=stats)
+
+    assert counts(stats)[("delete files", "file")] == snapshot((11, 0))
+
+    group_stats = Stats()
+    minimize_all(sources, check_bug_in_every_file, independent=True, stats=group_stats)
+
+    # the statistics of the worker processes are merged
+    assert counts(group_stats)[("delete files", "file")] == snapshot((9, 0))
+    assert group_stats.total().accepted == stats.total().accepted
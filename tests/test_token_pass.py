@@ -0,0 +1,73 @@
+import contextlib
+import io
+import keyword
+import string
+
+from inline_snapshot import snapshot
+from pysource_minimize import minimize
+from pysource_minimize._token_pass import _tokens
+from pysource_minimize._token_pass import apply_edits
+from pysource_minimize._token_pass import identifiers
+from pysource_minimize._token_pass import TokenPass
+
+
+def prints_bug(source):
+    out = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(out):
+            exec(source, {})
+    except Exception:
+        return False
+    return "bug" in out.getvalue()
+
+
+def test_token_pass():
+    source = """\
+import os.path
+long_variable_name = (1234567 + (2))
+print(os.path.join("some long string", str(long_variable_name)), "bug")
+"""
+    assert TokenPass(source, prints_bug).source == snapshot("""\
+import os
+a = 0 + 2
+print(os.path.join('', str(a)), "bug")
+""")
+
+
+def test_apply_edits():
+    assert apply_edits("not(x)", [(3, 4, ""), (5, 6, "")]) == "not x"
+
+
+def test_minimize_with_token_pass():
+    source = """\
+class Container:
+    def __init__(self):
+        self.value = "bug"
+print(Container().value)
+"""
+    assert minimize(source, prints_bug) == snapshot("""\
+class Container:
+
+    def __init__(self):
+        self.value = 'bug'
+print(Container().value)\
+""")
+    assert minimize(source, prints_bug, token_pass=True) == snapshot("""\
+class a:
+
+    def __init__(e):
+        e.c = 'bug'
+print(a().c)\
+""")
+
+
+def test_identifiers_skip_keywords():
+    source = (
+        " ".join(string.ascii_lowercase)
+        + " "
+        + " ".join(f"long_name_{i}" for i in range(30))
+    )
+    new_names = [group[0][2] for group in identifiers(_tokens(source))]
+
+    assert not any(keyword.iskeyword(name) for name in new_names)
+    assert new_names[17:19] == snapshot(["ar", "at"])
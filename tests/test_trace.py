@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+import pytest
+from inline_snapshot import snapshot
+from pysource_minimize import JsonlTracer
+from pysource_minimize import minimize
+from pysource_minimize import Tracer
+from pysource_minimize._minimize import minimize_all
+
+from .test_minimize_all import check_bug_in_every_file
+
+source = """
+def f():
+    print("bug"+"other string")
+    return 1+1
+f()
+"""
+
+
+def test_jsonl_tracer(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    with JsonlTracer(trace_file) as tracer:
+        minimize(source, lambda source: "bug" in source, tracer=tracer)
+
+    events = [json.loads(line) for line in trace_file.read_text().splitlines()]
+
+    assert events[:2] == [
+        {"event": "round", "round": 0, "size": 20, "time": events[0]["time"]},
+        {
+            "event": "strategy_start",
+            "strategy": "MinimizeStructure",
+            "size": 20,
+            "time": events[1]["time"],
+        },
+    ]
+
+    times = [event["time"] for event in events]
+    assert times == sorted(times)
+
+    attempts = [e for e in events if e["event"] == "attempt"]
+    results = [e for e in events if e["event"] in ("accept", "reject")]
+    assert len(attempts) == len(results)
+    for attempt, result in zip(attempts, results):
+        assert {**attempt, "event": None, "time": None} == {
+            **result,
+            "event": None,
+            "time": None,
+        }
+
+    assert {e["branch"] for e in attempts} >= {"minimize_list", "minimize_stmt"}
+    assert [e["size"] for e in events if e["event"] == "accept"][-1] == 3
+
+    assert [e["round"] for e in events if e["event"] == "round"] == snapshot([0, 1, 2])
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.events = []
+
+    def on_attempt(self, **data):
+        self.events.append(("attempt", data["strategy"], data["size"]))
+
+    def on_accept(self, **data):
+        self.events.append(("accept", data["strategy"], data["size"]))
+
+
+def test_minimize_all_tracer():
+    sources = {Path(f"f{i}.py"): f"x={i}\n'bug'" for i in range(2)}
+    tracer = RecordingTracer()
+    minimize_all(sources, check_bug_in_every_file, tracer=tracer)
+
+    assert tracer.events[:3] == snapshot(
+        [
+            ("attempt", "delete files", 0),
+            ("attempt", "delete files", 1),
+            ("attempt", "delete files", 1),
+        ]
+    )
+    assert ("accept", "MinimizeStructure", 3) in tracer.events
+
+    with pytest.raises(ValueError):
+        minimize_all(sources, check_bug_in_every_file, independent=True, tracer=tracer)
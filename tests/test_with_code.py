@@ -0,0 +1,49 @@
+import types
+
+import pytest
+from inline_snapshot import snapshot
+from pysource_minimize import iter_minimize
+from pysource_minimize import minimize
+
+source = """
+def f(a):
+    return a * 2
+x = f(21)
+y = 5
+"""
+
+
+def checker(source, code):
+    assert isinstance(code, types.CodeType)
+    namespace = {}
+    try:
+        exec(code, namespace)
+    except Exception:
+        return False
+    return namespace.get("x") == 42
+
+
+def test_with_code():
+    assert minimize(source, checker, with_code=True) == snapshot("""\
+def f(a):
+    return a * 2
+x = f(21)\
+""")
+
+
+def test_token_pass():
+    assert minimize(source, checker, with_code=True, token_pass=True) == snapshot("""\
+def f(a):
+    return a * 2
+x = f(21)\
+""")
+
+
+def test_iter_minimize():
+    results = list(iter_minimize(source, checker, with_code=True))
+    assert results[-1] == minimize(source, checker, with_code=True)
+
+
+def test_requires_compilable():
+    with pytest.raises(ValueError):
+        minimize(source, checker, with_code=True, compilable=False)